@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -123,11 +124,31 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+MEDIA_URL = "media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
+# Uploads are streamed to temporary files before being moved into
+# MEDIA_ROOT; keep this on the same filesystem so the move is a rename.
+# The tasks app creates the directory at startup.
+FILE_UPLOAD_TEMP_DIR = MEDIA_ROOT / "tmp"
+
+# How attachment downloads are sent: None streams them from Django (with
+# sendfile() where the WSGI server supports it), "x-accel-redirect" hands
+# them to nginx through the internal location below, and "x-sendfile" to
+# Apache or lighttpd.
+ATTACHMENT_OFFLOAD = None
+ATTACHMENT_OFFLOAD_PREFIX = "/protected-media/"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# API session tokens (see users/tokens.py)
+AUTH_TOKEN_LIFETIME = timedelta(days=30)
+AUTH_TOKEN_CACHE_SIZE = 10000
+AUTH_TOKEN_CACHE_TTL = 60  # seconds a token -> user entry may be served from memory
+
 JAZZMIN_SETTINGS = {
     "site_title": "Task Manager Admin",
     "site_header": "Task Manager Dashboard",
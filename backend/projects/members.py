@@ -0,0 +1,37 @@
+from django.db import transaction
+from users.utils import diff_user_ids
+
+
+def current_member_ids(project):
+    return set(project.members.values_list("id", flat=True))
+
+
+def _apply(project, add, remove):
+    """Apply a membership diff with one bulk insert and one filtered delete.
+
+    Going through ``members.add`` / ``members.remove`` keeps the m2m signals
+    firing, so ProjectAccess and the listing ETags stay in sync. Members in
+    neither set are never touched.
+    """
+    with transaction.atomic():
+        if remove:
+            project.members.remove(*remove)
+        if add:
+            project.members.add(*add)
+    return sorted(add), sorted(remove)
+
+
+def add_members(project, user_ids):
+    return _apply(project, *diff_user_ids("add", user_ids, current_member_ids(project)))
+
+
+def remove_members(project, user_ids):
+    return _apply(
+        project, *diff_user_ids("remove", user_ids, current_member_ids(project))
+    )
+
+
+def replace_members(project, user_ids):
+    return _apply(
+        project, *diff_user_ids("replace", user_ids, current_member_ids(project))
+    )
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_project_access(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    ProjectAccess = apps.get_model("projects", "ProjectAccess")
+    Membership = Project.members.through
+
+    rows = [
+        ProjectAccess(user_id=owner_id, project_id=project_id)
+        for project_id, owner_id in Project.objects.values_list("id", "owner_id")
+    ]
+    rows += [
+        ProjectAccess(user_id=user_id, project_id=project_id)
+        for project_id, user_id in Membership.objects.values_list(
+            "project_id", "customuser_id"
+        )
+    ]
+    ProjectAccess.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0001_initial"),
+        ("users", "0002_remove_customuser_bio_customuser_password_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProjectAccess",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="access",
+                        to="projects.project",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="project_access",
+                        to="users.customuser",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("user", "project")},
+            },
+        ),
+        migrations.RunPython(populate_project_access, migrations.RunPython.noop),
+    ]
@@ -20,6 +20,71 @@ class Project(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     deadline = models.DateTimeField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
+    # Number of the project's tasks in each status, maintained by
+    # tasks.counters; see TASK_COUNT_FIELDS.
+    todo_task_count = models.PositiveIntegerField(default=0, editable=False)
+    in_progress_task_count = models.PositiveIntegerField(default=0, editable=False)
+    review_task_count = models.PositiveIntegerField(default=0, editable=False)
+    completed_task_count = models.PositiveIntegerField(default=0, editable=False)
+    archived_task_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # Task status -> column counting the project's tasks in that status.
+    TASK_COUNT_FIELDS = {
+        "todo": "todo_task_count",
+        "in_progress": "in_progress_task_count",
+        "review": "review_task_count",
+        "completed": "completed_task_count",
+        "archived": "archived_task_count",
+    }
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets projects.signals skip the access resync unless the owner moved.
+        if "owner_id" in field_names:
+            instance._loaded_owner_id = instance.owner_id
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using, fields, from_queryset)
+        if "owner_id" in self.__dict__:
+            self._loaded_owner_id = self.owner_id
+
+    def save(self, *args, **kwargs):
+        # The task counters are written only through F() updates in
+        # tasks.counters; never write back the values loaded with the row.
+        adding = self._state.adding or kwargs.get("force_insert")
+        if not adding and kwargs.get("update_fields") is None:
+            counters = set(self.TASK_COUNT_FIELDS.values())
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in counters
+            ]
+        return super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
+
+
+class ProjectAccess(models.Model):
+    """Materialized ``user -> visible project`` rows.
+
+    One row per owner or member of a project, maintained by the signal
+    handlers in ``projects.signals``. Visibility checks become a single probe
+    of the ``(user, project)`` unique index instead of an OR across the owner
+    column and the members join table.
+    """
+
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, related_name="project_access"
+    )
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="access"
+    )
+
+    class Meta:
+        unique_together = ["user", "project"]
+
+    def __str__(self):
+        return f"{self.user} can access {self.project}"
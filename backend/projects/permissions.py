@@ -0,0 +1,57 @@
+from functools import wraps
+
+from users.responses import JsonResponse
+
+from .models import ProjectAccess
+
+
+def can_access_project(request, project_id):
+    """Whether ``request.user`` owns or is a member of the project.
+
+    Answered by a single EXISTS probe on the ProjectAccess ``(user, project)``
+    index and memoized on the request, so repeated checks are free.
+    """
+    cache = request.__dict__.setdefault("_project_access", {})
+    project_id = int(project_id)
+    if project_id not in cache:
+        cache[project_id] = ProjectAccess.objects.filter(
+            user=request.user, project_id=project_id
+        ).exists()
+    return cache[project_id]
+
+
+async def acan_access_project(request, project_id):
+    """Async version of ``can_access_project``, sharing its memo."""
+    cache = request.__dict__.setdefault("_project_access", {})
+    project_id = int(project_id)
+    if project_id not in cache:
+        cache[project_id] = await ProjectAccess.objects.filter(
+            user=request.user, project_id=project_id
+        ).aexists()
+    return cache[project_id]
+
+
+def can_access_task(request, task):
+    """Whether ``request.user`` may act on ``task`` (via its project)."""
+    return can_access_project(request, task.project_id)
+
+
+async def acan_access_task(request, task):
+    return await acan_access_project(request, task.project_id)
+
+
+def project_access_required(view_func):
+    """Reject with 403 unless the user can access the ``project_id`` URL kwarg.
+
+    Must be applied inside ``token_required``.
+    """
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not can_access_project(request, kwargs["project_id"]):
+            return JsonResponse(
+                {"error": "Not authorized for this project"}, status=403
+            )
+        return view_func(request, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,93 @@
+from collections import namedtuple
+
+from django.db.models import Prefetch
+from users.models import CustomUser
+
+from .models import Project, ProjectAccess
+
+# columns: what .only() must load; select: relations to join; prefetch: whether
+# the members prefetch is needed; get: how to render the value.
+Field = namedtuple("Field", "columns select prefetch get")
+
+PROJECT_FIELDS = {
+    "id": Field(("id",), (), False, lambda p: p.id),
+    "name": Field(("name",), (), False, lambda p: p.name),
+    "description": Field(("description",), (), False, lambda p: p.description),
+    "status": Field(("status",), (), False, lambda p: p.status),
+    "deadline": Field(
+        ("deadline",),
+        (),
+        False,
+        lambda p: p.deadline,
+    ),
+    "owner": Field(
+        ("owner", "owner__email"),
+        ("owner",),
+        False,
+        lambda p: {"id": p.owner.id, "email": p.owner.email},
+    ),
+    "task_counts": Field(
+        tuple(Project.TASK_COUNT_FIELDS.values()),
+        (),
+        False,
+        lambda p: {
+            status: getattr(p, column)
+            for status, column in Project.TASK_COUNT_FIELDS.items()
+        },
+    ),
+    "members": Field(
+        (),
+        (),
+        True,
+        lambda p: [{"id": m.id, "email": m.email} for m in p.members.all()],
+    ),
+}
+
+
+def visible_projects(user):
+    """Projects the user owns or is a member of."""
+    return Project.objects.filter(
+        id__in=ProjectAccess.objects.filter(user=user).values("project_id")
+    )
+
+
+def project_queryset(queryset=None, fields=None):
+    """Load projects with the relations their serialized form needs.
+
+    The owner is joined in and members are fetched in one extra query for
+    the whole page. With ``fields`` only the requested columns are loaded and
+    the owner join / members prefetch are skipped when not asked for.
+    """
+    if queryset is None:
+        queryset = Project.objects.all()
+    selected = [PROJECT_FIELDS[name] for name in fields or PROJECT_FIELDS]
+    select = {rel for field in selected for rel in field.select}
+    if select:
+        queryset = queryset.select_related(*sorted(select))
+    if fields is not None:
+        columns = {"id"}
+        columns.update(col for field in selected for col in field.columns)
+        queryset = queryset.only(*sorted(columns))
+    if any(field.prefetch for field in selected):
+        queryset = queryset.prefetch_related(
+            Prefetch("members", queryset=CustomUser.objects.only("id", "email"))
+        )
+    return queryset
+
+
+def project_serializer(fields=None):
+    """Build a serializer emitting only ``fields`` (all fields by default)."""
+    getters = [(name, PROJECT_FIELDS[name].get) for name in fields or PROJECT_FIELDS]
+
+    def serialize(p):
+        return {name: get(p) for name, get in getters}
+
+    return serialize
+
+
+serialize_project = project_serializer()
+
+
+def get_serialized_project(project_id):
+    """Reload a single project through the projection and serialize it."""
+    return serialize_project(project_queryset().get(id=project_id))
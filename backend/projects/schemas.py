@@ -0,0 +1,25 @@
+from users.validation import IntegerList, Schema, from_model
+
+from .models import Project
+
+PROJECT_CREATE = Schema(
+    required_error="Name is required",
+    name=from_model(Project, "name", required=True),
+    description=from_model(Project, "description"),
+    status=from_model(Project, "status"),
+    deadline=from_model(Project, "deadline"),
+    members=IntegerList(default=()),
+)
+
+PROJECT_UPDATE = Schema(
+    name=from_model(Project, "name", blank=False),
+    description=from_model(Project, "description"),
+    status=from_model(Project, "status"),
+    deadline=from_model(Project, "deadline"),
+    members=IntegerList(null=True),
+)
+
+MEMBERS = Schema(
+    required_error="members must be a list of user IDs",
+    members=IntegerList(required=True),
+)
@@ -0,0 +1,72 @@
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Project, ProjectAccess
+
+
+def sync_project_access(project):
+    """Make the access rows of ``project`` match its owner and members."""
+    ProjectAccess.objects.bulk_create(
+        [ProjectAccess(user_id=project.owner_id, project=project)],
+        ignore_conflicts=True,
+    )
+    ProjectAccess.objects.filter(project=project).exclude(
+        user_id=project.owner_id
+    ).exclude(user__in=project.members.values("id")).delete()
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, update_fields=None, **kwargs):
+    owner_written = update_fields is None or "owner" in update_fields
+    if created:
+        ProjectAccess.objects.create(user_id=instance.owner_id, project=instance)
+    elif (
+        owner_written and instance.__dict__.get("_loaded_owner_id") != instance.owner_id
+    ):
+        # The owner changed; the previous owner keeps access only if they
+        # are also a member.
+        sync_project_access(instance)
+    instance._loaded_owner_id = instance.owner_id
+
+
+def touch_projects(project_ids):
+    """Bump ``updated_at`` so listings notice membership changes."""
+    Project.objects.filter(id__in=project_ids).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Project.members.through)
+def project_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        # The cleared projects are unknown afterwards; touch them now.
+        touch_projects(list(instance.projects.values_list("id", flat=True)))
+    elif action in ("post_add", "post_remove"):
+        touch_projects(pk_set if reverse else [instance.id])
+    elif action == "post_clear" and not reverse:
+        touch_projects([instance.id])
+
+    if action == "post_add":
+        if reverse:
+            rows = [ProjectAccess(user=instance, project_id=pk) for pk in pk_set]
+        else:
+            rows = [ProjectAccess(user_id=pk, project=instance) for pk in pk_set]
+        ProjectAccess.objects.bulk_create(rows, ignore_conflicts=True)
+    elif action == "post_remove":
+        if reverse:
+            # Owners never lose access by leaving the member list.
+            ProjectAccess.objects.filter(user=instance, project_id__in=pk_set).exclude(
+                project__owner=instance
+            ).delete()
+        else:
+            ProjectAccess.objects.filter(project=instance, user_id__in=pk_set).exclude(
+                user_id=instance.owner_id
+            ).delete()
+    elif action == "post_clear":
+        if reverse:
+            ProjectAccess.objects.filter(user=instance).exclude(
+                project__owner=instance
+            ).delete()
+        else:
+            ProjectAccess.objects.filter(project=instance).exclude(
+                user_id=instance.owner_id
+            ).delete()
@@ -1,3 +1,193 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from users.models import CustomUser
+from users.tokens import authenticate_token, issue_token, token_cache
 
-# Create your tests here.
+from .models import Project, ProjectAccess
+
+
+def make_user(name):
+    user = CustomUser.objects.create(
+        username=name,
+        email=f"{name}@example.com",
+        first_name=name,
+        last_name="Test",
+        password="secret",
+    )
+    user.token = issue_token(user)
+    return user
+
+
+class ProjectApiTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user("owner")
+        cls.members = [make_user(f"member{i}") for i in range(3)]
+        cls.project = Project.objects.create(name="Apollo", owner=cls.owner)
+        cls.project.members.add(*cls.members)
+
+    def setUp(self):
+        # Warm the token cache so query counts only cover the endpoint itself.
+        token_cache.clear()
+        authenticate_token(self.owner.token)
+
+    def auth(self, user=None):
+        user = user or self.owner
+        return {"HTTP_AUTHORIZATION": f"Bearer {user.token}"}
+
+
+class ListProjectsTests(ProjectApiTestCase):
+    def test_full_listing_has_fixed_query_count(self):
+        Project.objects.create(name="Gemini", owner=self.owner)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("projects:list_projects"), **self.auth())
+        self.assertEqual(response.status_code, 200)
+        projects = {p["name"]: p for p in response.json()["projects"]}
+        self.assertEqual(len(projects["Apollo"]["members"]), 3)
+        self.assertEqual(projects["Gemini"]["owner"]["email"], self.owner.email)
+        # ETag fingerprint, projects with owners joined, members of all of them
+        self.assertEqual(len(ctx.captured_queries), 3)
+
+    def test_sparse_fields_skip_members(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(
+                reverse("projects:list_projects"),
+                {"fields": "id,name"},
+                **self.auth(),
+            )
+        self.assertEqual(
+            response.json()["projects"], [{"id": self.project.id, "name": "Apollo"}]
+        )
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+
+class ProjectAccessTests(ProjectApiTestCase):
+    def access(self, project=None):
+        project = project or self.project
+        return set(
+            ProjectAccess.objects.filter(project=project).values_list(
+                "user_id", flat=True
+            )
+        )
+
+    def test_owner_and_members_have_access(self):
+        self.assertEqual(self.access(), {self.owner.id, *(m.id for m in self.members)})
+
+    def test_member_changes_are_mirrored(self):
+        newcomer = make_user("newcomer")
+        self.project.members.remove(self.members[0])
+        newcomer.projects.add(self.project)
+        self.assertNotIn(self.members[0].id, self.access())
+        self.assertIn(newcomer.id, self.access())
+
+        self.project.members.clear()
+        self.assertEqual(self.access(), {self.owner.id})
+
+    def test_owner_change_revokes_previous_owner(self):
+        self.project.owner = self.members[0]
+        self.project.save()
+        self.assertNotIn(self.owner.id, self.access())
+        self.assertIn(self.members[0].id, self.access())
+
+    def test_listing_needs_no_distinct(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("projects:list_projects"), **self.auth())
+        self.assertNotIn("DISTINCT", " ".join(q["sql"] for q in ctx.captured_queries))
+
+
+class ConditionalProjectListTests(ProjectApiTestCase):
+    def test_membership_change_invalidates_etag(self):
+        url = reverse("projects:list_projects")
+        etag = self.client.get(url, **self.auth())["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **self.auth())
+        self.assertEqual(response.status_code, 304)
+
+        self.project.members.remove(self.members[0])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **self.auth())
+        self.assertEqual(response.status_code, 200)
+
+
+class ProjectMembershipTests(ProjectApiTestCase):
+    def members_request(self, method, user_ids):
+        return getattr(self.client, method)(
+            reverse("projects:project_members", args=[self.project.id]),
+            data={"members": user_ids},
+            content_type="application/json",
+            **self.auth(),
+        )
+
+    def test_metadata_update_does_not_touch_members(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.put(
+                reverse("projects:update_project", args=[self.project.id]),
+                data={"name": "Artemis"},
+                content_type="application/json",
+                **self.auth(),
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["project"]["name"], "Artemis")
+        self.assertEqual(len(response.json()["project"]["members"]), 3)
+        members_table = Project.members.through._meta.db_table
+        writes = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if q["sql"].startswith(
+                (f'INSERT INTO "{members_table}"', f'DELETE FROM "{members_table}"')
+            )
+        ]
+        self.assertEqual(writes, [])
+        # The owner did not change, so the access rows are not resynced.
+        access_table = ProjectAccess._meta.db_table
+        self.assertFalse(
+            [q for q in ctx.captured_queries if f'INTO "{access_table}"' in q["sql"]]
+        )
+        self.assertFalse(
+            [q for q in ctx.captured_queries if f'FROM "{access_table}"' in q["sql"]]
+        )
+
+    def test_replace_applies_only_the_difference(self):
+        newcomer = make_user("newcomer")
+        keep = [m.id for m in self.members[1:]]
+        response = self.client.put(
+            reverse("projects:update_project", args=[self.project.id]),
+            data={"members": [*keep, newcomer.id, 9999]},
+            content_type="application/json",
+            **self.auth(),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {m["id"] for m in response.json()["project"]["members"]},
+            {*keep, newcomer.id},
+        )
+        self.assertNotIn(
+            self.members[0].id,
+            ProjectAccess.objects.filter(project=self.project).values_list(
+                "user_id", flat=True
+            ),
+        )
+
+    def test_add_and_remove_endpoints(self):
+        newcomer = make_user("newcomer")
+        response = self.members_request("post", [newcomer.id, self.members[0].id])
+        self.assertEqual(response.json()["added"], [newcomer.id])
+        self.assertTrue(
+            ProjectAccess.objects.filter(project=self.project, user=newcomer).exists()
+        )
+
+        response = self.members_request("delete", [newcomer.id])
+        self.assertEqual(response.json()["removed"], [newcomer.id])
+        self.assertFalse(
+            ProjectAccess.objects.filter(project=self.project, user=newcomer).exists()
+        )
+
+    def test_only_owner_may_change_members(self):
+        authenticate_token(self.members[0].token)
+        response = self.client.post(
+            reverse("projects:project_members", args=[self.project.id]),
+            data={"members": [self.members[0].id]},
+            content_type="application/json",
+            **self.auth(self.members[0]),
+        )
+        self.assertEqual(response.status_code, 404)
@@ -8,6 +8,11 @@ urlpatterns = [
     path("projects/", views.list_projects, name="list_projects"),
     path("projects/create/", views.create_project, name="create_project"),
     path("projects/<int:project_id>/", views.update_project, name="update_project"),
+    path(
+        "projects/<int:project_id>/members/",
+        views.project_members,
+        name="project_members",
+    ),
     path(
         "projects/<int:project_id>/delete/", views.delete_project, name="delete_project"
     ),
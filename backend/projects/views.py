@@ -1,12 +1,21 @@
-import json
 import logging
 
-from django.http import JsonResponse
+from django.db.models import Count, Max, Sum
 from django.views.decorators.csrf import csrf_exempt
-from users.models import CustomUser
-from users.utils import token_required
+from users.responses import JsonResponse
+from users.utils import conditional, parse_fields, token_required
+from users.validation import SchemaError
 
+from .members import add_members, remove_members, replace_members
 from .models import Project
+from .schemas import MEMBERS, PROJECT_CREATE, PROJECT_UPDATE
+from .projections import (
+    PROJECT_FIELDS,
+    get_serialized_project,
+    project_queryset,
+    project_serializer,
+    visible_projects,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -16,88 +25,57 @@ logger = logging.getLogger(__name__)
 def create_project(request):
     if request.method == "POST":
         try:
-            data = json.loads(request.body.decode("utf-8"))
-            name = data.get("name")
-            description = data.get("description", "")
-            deadline = data.get("deadline")
-            status = data.get("status", "active")
-            member_ids = data.get("members", [])
-
-            if not name:
-                return JsonResponse({"error": "Name is required"}, status=400)
-
-            project = Project(
-                name=name,
-                description=description,
-                owner=request.user,
-                deadline=deadline,
-                status=status,
-            )
+            data = PROJECT_CREATE.decode(request.body)
+            member_ids = data.pop("members")
+
+            project = Project(owner=request.user, **data)
             project.save()
 
-            for member_id in member_ids:
-                try:
-                    member = CustomUser.objects.get(id=member_id)
-                    project.members.add(member)
-                except CustomUser.DoesNotExist:
-                    pass
+            add_members(project, member_ids)
 
             return JsonResponse(
                 {
                     "message": "Request processed successfully",
-                    "project": {
-                        "id": project.id,
-                        "name": project.name,
-                        "description": project.description,
-                        "status": project.status,
-                        "deadline": (
-                            project.deadline.isoformat() if project.deadline else None
-                        ),
-                        "owner": {"id": project.owner.id, "email": project.owner.email},
-                        "members": [
-                            {"id": m.id, "email": m.email}
-                            for m in project.members.all()
-                        ],
-                    },
+                    "project": get_serialized_project(project.id),
                 },
                 status=201,
             )
-        except json.JSONDecodeError:
-            return JsonResponse({"error": "Invalid JSON format"}, status=400)
+        except SchemaError as e:
+            return JsonResponse({"error": str(e)}, status=400)
         except Exception as e:
             logger.error(f"Create project error: {str(e)}")
             return JsonResponse({"error": str(e)}, status=500)
     return JsonResponse({"error": "Method not allowed"}, status=405)
 
 
+async def project_list_state(request):
+    state = await visible_projects(request.user).aaggregate(
+        count=Count("id"), id_sum=Sum("id"), last_modified=Max("updated_at")
+    )
+    return (request.user.id, *state.values()), state["last_modified"]
+
+
 @token_required
-def list_projects(request):
+@conditional(project_list_state)
+async def list_projects(request):
     if request.method == "GET":
         try:
-            projects = Project.objects.filter(
-                owner=request.user
-            ) | Project.objects.filter(members=request.user)
-            projects = projects.distinct()
+            projects = visible_projects(request.user)
             status_filter = request.GET.get("status")
             if status_filter:
                 projects = projects.filter(status=status_filter)
 
+            try:
+                fields = parse_fields(request.GET.get("fields"), PROJECT_FIELDS)
+            except ValueError as e:
+                return JsonResponse({"error": str(e)}, status=400)
+            serialize = project_serializer(fields)
+
             return JsonResponse(
                 {
                     "message": "Request processed successfully",
                     "projects": [
-                        {
-                            "id": p.id,
-                            "name": p.name,
-                            "description": p.description,
-                            "status": p.status,
-                            "deadline": p.deadline.isoformat() if p.deadline else None,
-                            "owner": {"id": p.owner.id, "email": p.owner.email},
-                            "members": [
-                                {"id": m.id, "email": m.email} for m in p.members.all()
-                            ],
-                        }
-                        for p in projects
+                        serialize(p) async for p in project_queryset(projects, fields)
                     ],
                 },
                 status=200,
@@ -113,40 +91,20 @@ def list_projects(request):
 def update_project(request, project_id):
     if request.method == "PUT":
         try:
+            data = PROJECT_UPDATE.decode(request.body)
             project = Project.objects.get(id=project_id, owner=request.user)
-            data = json.loads(request.body.decode("utf-8"))
-            project.name = data.get("name", project.name)
-            project.description = data.get("description", project.description)
-            project.status = data.get("status", project.status)
-            project.deadline = data.get("deadline", project.deadline)
+            member_ids = data.pop("members", None)
+            for name, value in data.items():
+                setattr(project, name, value)
             project.save()
 
-            member_ids = data.get("members", [])
-            project.members.clear()
-            for member_id in member_ids:
-                try:
-                    member = CustomUser.objects.get(id=member_id)
-                    project.members.add(member)
-                except CustomUser.DoesNotExist:
-                    pass
+            if member_ids is not None:
+                replace_members(project, member_ids)
 
             return JsonResponse(
                 {
                     "message": "Request processed successfully",
-                    "project": {
-                        "id": project.id,
-                        "name": project.name,
-                        "description": project.description,
-                        "status": project.status,
-                        "deadline": (
-                            project.deadline.isoformat() if project.deadline else None
-                        ),
-                        "owner": {"id": project.owner.id, "email": project.owner.email},
-                        "members": [
-                            {"id": m.id, "email": m.email}
-                            for m in projects.members.all()
-                        ],
-                    },
+                    "project": get_serialized_project(project.id),
                 },
                 status=200,
             )
@@ -154,14 +112,51 @@ def update_project(request, project_id):
             return JsonResponse(
                 {"error": "Project not found or not authorized"}, status=404
             )
-        except json.JSONDecodeError:
-            return JsonResponse({"error": "Invalid JSON format"}, status=400)
+        except SchemaError as e:
+            return JsonResponse({"error": str(e)}, status=400)
         except Exception as e:
             logger.error(f"Update project error: {str(e)}")
             return JsonResponse({"error": str(e)}, status=500)
     return JsonResponse({"error": "Method not allowed"}, status=405)
 
 
+MEMBER_OPERATIONS = {
+    "POST": add_members,
+    "DELETE": remove_members,
+    "PUT": replace_members,
+}
+
+
+@csrf_exempt
+@token_required
+def project_members(request, project_id):
+    operation = MEMBER_OPERATIONS.get(request.method)
+    if operation:
+        try:
+            data = MEMBERS.decode(request.body)
+            project = Project.objects.get(id=project_id, owner=request.user)
+            added, removed = operation(project, data["members"])
+            return JsonResponse(
+                {
+                    "message": "Request processed successfully",
+                    "added": added,
+                    "removed": removed,
+                    "project": get_serialized_project(project.id),
+                },
+                status=200,
+            )
+        except Project.DoesNotExist:
+            return JsonResponse(
+                {"error": "Project not found or not authorized"}, status=404
+            )
+        except SchemaError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        except Exception as e:
+            logger.error(f"Project members error: {str(e)}")
+            return JsonResponse({"error": str(e)}, status=500)
+    return JsonResponse({"error": "Method not allowed"}, status=405)
+
+
 @csrf_exempt
 @token_required
 def delete_project(request, project_id):
@@ -1,11 +1,21 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Task, TaskAssignment, TaskAttachment
+from .models import (
+    AttachmentBlob,
+    Category,
+    Comment,
+    Tag,
+    Task,
+    TaskAssignment,
+    TaskAttachment,
+)
 
 # Register your models here.
 
 admin.site.register(Category)
+admin.site.register(Tag)
 admin.site.register(Task)
 admin.site.register(TaskAssignment)
 admin.site.register(Comment)
 admin.site.register(TaskAttachment)
+admin.site.register(AttachmentBlob)
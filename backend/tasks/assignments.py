@@ -0,0 +1,51 @@
+from django.db import transaction
+from users.utils import diff_user_ids
+
+from .counters import adjust_task_counts
+from .models import TaskAssignment
+
+
+def current_assignee_ids(task_id):
+    return set(
+        TaskAssignment.objects.filter(task_id=task_id).values_list("user_id", flat=True)
+    )
+
+
+def _apply(task_id, add, remove):
+    """Insert ``add`` and delete ``remove`` with one statement each.
+
+    Rows for users in neither set are left alone, so their ``status`` and
+    ``assigned_at`` survive. ``assignee_count`` (and with it ``updated_at``)
+    follows in the same transaction with one UPDATE per direction. The
+    delete is raw: nothing depends on assignment rows, and sending
+    ``post_delete`` per row would cost a counter UPDATE each.
+    """
+    with transaction.atomic():
+        if remove:
+            rows = TaskAssignment.objects.filter(task_id=task_id, user_id__in=remove)
+            removed = rows._raw_delete(rows.db)
+            adjust_task_counts("assignee_count", {task_id: -removed})
+        if add:
+            TaskAssignment.objects.bulk_create(
+                [TaskAssignment(task_id=task_id, user_id=pk) for pk in add]
+            )
+            adjust_task_counts("assignee_count", {task_id: len(add)})
+    return sorted(add), sorted(remove)
+
+
+def add_assignees(task_id, user_ids):
+    return _apply(
+        task_id, *diff_user_ids("add", user_ids, current_assignee_ids(task_id))
+    )
+
+
+def remove_assignees(task_id, user_ids):
+    return _apply(
+        task_id, *diff_user_ids("remove", user_ids, current_assignee_ids(task_id))
+    )
+
+
+def replace_assignees(task_id, user_ids):
+    return _apply(
+        task_id, *diff_user_ids("replace", user_ids, current_assignee_ids(task_id))
+    )
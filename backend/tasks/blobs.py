@@ -0,0 +1,88 @@
+import hashlib
+
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import AttachmentBlob
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """Stream each uploaded file to a temporary file while hashing it.
+
+    Nothing is buffered in memory: every chunk is written to disk and fed to
+    SHA-256 as it arrives, so the finished upload already knows its digest
+    and size.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        upload = super().file_complete(file_size)
+        upload.sha256 = self.digest.hexdigest()
+        return upload
+
+
+def _claim(sha256):
+    """Take a reference on an existing blob; returns it or None."""
+    if AttachmentBlob.objects.filter(sha256=sha256).update(
+        ref_count=F("ref_count") + 1
+    ):
+        return AttachmentBlob.objects.get(sha256=sha256)
+    return None
+
+
+def store_blob(upload):
+    """Return the blob holding ``upload``'s bytes with one more reference.
+
+    ``upload`` must come from HashingUploadHandler. When a blob with the
+    same digest exists only its reference count changes and the temporary
+    file is discarded unread; otherwise the temporary file is moved (not
+    copied) into storage. Call inside the transaction that creates the
+    attachment.
+    """
+    blob = _claim(upload.sha256)
+    if blob is not None:
+        return blob
+    blob = AttachmentBlob(sha256=upload.sha256, size=upload.size, ref_count=1)
+    blob.file.save(upload.sha256, upload, save=False)
+    try:
+        with transaction.atomic():
+            blob.save()
+    except IntegrityError:
+        # Another request stored the same bytes first.
+        blob.file.delete(save=False)
+        blob = _claim(upload.sha256)
+    return blob
+
+
+def thumbnail_name(key):
+    """Storage name of the thumbnail derived from a blob digest (or other key)."""
+    return f"thumbnails/{key}.png"
+
+
+def release_blob(blob_id):
+    """Drop one reference and remove the blob once nothing uses it.
+
+    The file and any thumbnail made from it are deleted only after the
+    transaction commits, and only if no upload re-created the blob in the
+    meantime.
+    """
+    AttachmentBlob.objects.filter(id=blob_id).update(ref_count=F("ref_count") - 1)
+    blob = AttachmentBlob.objects.filter(id=blob_id, ref_count=0).first()
+    if blob is None:
+        return
+    blob.delete()
+
+    def delete_file():
+        if not AttachmentBlob.objects.filter(sha256=blob.sha256).exists():
+            blob.file.storage.delete(blob.file.name)
+            blob.file.storage.delete(thumbnail_name(blob.sha256))
+
+    transaction.on_commit(delete_file)
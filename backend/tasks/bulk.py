@@ -0,0 +1,156 @@
+from collections import Counter
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from projects.models import Project, ProjectAccess
+from users.models import CustomUser
+from users.validation import SchemaError
+
+from .counters import adjust_status_counts
+from .models import Category, Task, TaskAssignment, TaskTag
+from .projections import filter_tasks
+from .schemas import TASK_CREATE
+from .search import index_tasks
+from .tags import tag_ids_for
+
+
+def _ids(items, key):
+    return {data[key] for _, data in items if data.get(key)}
+
+
+def bulk_create_tasks(user, items):
+    """Validate and insert many tasks at once.
+
+    Each item is checked against the same schema as create_task before any
+    query runs. Every lookup is then done once for the whole batch (one
+    query each for projects, access, categories, dependencies and assignees)
+    and the inserts are a handful of ``bulk_create`` calls in a single
+    transaction. Invalid items are skipped and reported; valid ones are
+    created.
+
+    Returns ``(created_ids, errors)`` where ``errors`` is a list of
+    ``{"index": i, "error": message}``.
+    """
+    cleaned, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            cleaned.append((index, TASK_CREATE.validate(item)))
+        except SchemaError as e:
+            errors.append({"index": index, "error": str(e)})
+
+    project_ids = _ids(cleaned, "project_id")
+    existing_projects = set(
+        Project.objects.filter(id__in=project_ids).values_list("id", flat=True)
+    )
+    accessible_projects = set(
+        ProjectAccess.objects.filter(user=user, project_id__in=project_ids).values_list(
+            "project_id", flat=True
+        )
+    )
+    categories = set(
+        Category.objects.filter(id__in=_ids(cleaned, "category_id")).values_list(
+            "id", flat=True
+        )
+    )
+    dependency_projects = dict(
+        Task.objects.filter(id__in=_ids(cleaned, "depends_on_id")).values_list(
+            "id", "project_id"
+        )
+    )
+    assignee_ids = {pk for _, data in cleaned for pk in data["assignees"]}
+    users = set(
+        CustomUser.objects.filter(id__in=assignee_ids).values_list("id", flat=True)
+    )
+
+    valid = []
+    for index, data in cleaned:
+        project_id = data["project_id"]
+        if project_id not in existing_projects:
+            errors.append({"index": index, "error": "Project not found"})
+            continue
+        if project_id not in accessible_projects:
+            errors.append({"index": index, "error": "Not authorized for this project"})
+            continue
+        category_id = data.get("category_id")
+        if category_id and category_id not in categories:
+            errors.append({"index": index, "error": "Category not found"})
+            continue
+        depends_on_id = data.get("depends_on_id")
+        if depends_on_id and dependency_projects.get(depends_on_id) != project_id:
+            errors.append({"index": index, "error": "Dependent task not found"})
+            continue
+
+        tags = data.pop("tags")
+        assignees = list(
+            dict.fromkeys(pk for pk in data.pop("assignees") if pk in users)
+        )
+        task = Task(created_by=user, assignee_count=len(assignees), **data)
+        valid.append((task, assignees, tags))
+    errors.sort(key=lambda error: error["index"])
+
+    if not valid:
+        return [], errors
+
+    with transaction.atomic():
+        tasks = Task.objects.bulk_create([task for task, _, _ in valid])
+        TaskAssignment.objects.bulk_create(
+            [
+                TaskAssignment(task=task, user_id=user_id)
+                for task, assignees, _ in valid
+                for user_id in assignees
+            ]
+        )
+        adjust_status_counts(Counter((task.project_id, task.status) for task in tasks))
+        tag_ids = tag_ids_for(name for _, _, names in valid for name in names)
+        TaskTag.objects.bulk_create(
+            [
+                TaskTag(task=task, tag_id=tag_ids[name])
+                for task, _, names in valid
+                for name in names
+            ]
+        )
+        created_ids = [task.id for task in tasks]
+        index_tasks(created_ids)
+    return created_ids, errors
+
+
+def bulk_update_tasks(user, changes, ids=None, filters=None):
+    """Apply ``changes`` to the selected tasks the user owns.
+
+    Arguments come from the BULK_UPDATE schema, already validated. Tasks
+    are selected by explicit ``ids`` or by list_tasks-style ``filters``,
+    restricted to projects owned by ``user`` (the same rule as update_task).
+    The write is one ``UPDATE ... WHERE id IN (...)`` that also bumps
+    ``updated_at``. Returns the affected task ids; raises ValidationError
+    when nothing is selected or changed.
+    """
+    if not changes:
+        raise ValidationError("changes must be a non-empty object")
+    tasks = Task.objects.filter(project__owner=user)
+    if ids is not None:
+        tasks = tasks.filter(id__in=ids)
+    elif filters:
+        tasks = filter_tasks(tasks, filters)
+    else:
+        raise ValidationError("Either ids or a filter is required")
+
+    with transaction.atomic():
+        affected = list(tasks.order_by("id").values_list("id", flat=True))
+        if affected and "status" in changes:
+            moved = Counter()
+            for row in (
+                Task.objects.filter(id__in=affected)
+                .values("project_id", "status")
+                .annotate(count=Count("id"))
+                .order_by()
+            ):
+                moved[row["project_id"], row["status"]] -= row["count"]
+                moved[row["project_id"], changes["status"]] += row["count"]
+            adjust_status_counts(moved)
+        if affected:
+            Task.objects.filter(id__in=affected).update(
+                **changes, updated_at=timezone.now()
+            )
+    return affected
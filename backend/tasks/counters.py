@@ -0,0 +1,114 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from projects.models import Project
+
+from .models import Comment, Task, TaskAssignment, TaskAttachment
+
+# Task counter column -> model whose rows it counts. Single-row saves and
+# deletes are counted by the receivers in tasks.signals; bulk paths
+# (bulk_create, QuerySet.update, raw deletes) bypass signals, so those call
+# sites adjust the counters themselves with one statement per batch.
+TASK_COUNTERS = {
+    "comment_count": Comment,
+    "attachment_count": TaskAttachment,
+    "assignee_count": TaskAssignment,
+}
+
+
+def adjust_task_counts(field, deltas):
+    """Add ``deltas[task_id]`` to ``field`` of each task.
+
+    Tasks sharing a delta are updated by one statement. ``updated_at`` is
+    bumped too, so conditional listings notice the new counts. Call inside
+    the transaction of the write being counted.
+    """
+    by_delta = defaultdict(list)
+    for task_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(task_id)
+    now = timezone.now()
+    for delta, task_ids in by_delta.items():
+        Task.objects.filter(id__in=task_ids).update(
+            **{field: F(field) + delta}, updated_at=now
+        )
+
+
+def adjust_status_counts(deltas):
+    """Apply ``{(project_id, status): delta}`` to the project counters.
+
+    Each project is updated by one statement covering all its statuses.
+    """
+    changes = defaultdict(dict)
+    for (project_id, status), delta in deltas.items():
+        if delta:
+            field = Project.TASK_COUNT_FIELDS[status]
+            changes[project_id][field] = F(field) + delta
+    now = timezone.now()
+    for project_id, fields in changes.items():
+        Project.objects.filter(id=project_id).update(**fields, updated_at=now)
+
+
+def _count(model, column, **filters):
+    """``COUNT(*)`` of ``model`` rows whose ``column`` is the outer row."""
+    rows = (
+        model.objects.filter(**{column: OuterRef("pk")}, **filters)
+        .order_by()
+        .values(column)
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+def _repair(queryset, expected, batch_size, dry_run):
+    """Fix rows of ``queryset`` whose counters differ from ``expected``.
+
+    Walks the table in primary-key batches. Per batch one query finds the
+    drifted rows and one UPDATE recomputes them from the source tables, so
+    a write racing with the repair cannot be overwritten by a stale value.
+    Returns the number of drifted rows.
+    """
+    repaired, last_id = 0, 0
+    drifted = Q()
+    for field in expected:
+        drifted |= ~Q(**{field: F(f"expected_{field}")})
+    while True:
+        ids = list(
+            queryset.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return repaired
+        last_id = ids[-1]
+        with transaction.atomic():
+            bad = list(
+                queryset.filter(id__in=ids)
+                .annotate(
+                    **{f"expected_{field}": expr for field, expr in expected.items()}
+                )
+                .filter(drifted)
+                .values_list("id", flat=True)
+            )
+            if bad and not dry_run:
+                queryset.filter(id__in=bad).update(
+                    **expected, updated_at=timezone.now()
+                )
+        repaired += len(bad)
+
+
+def repair_task_counters(batch_size=1000, dry_run=False):
+    expected = {field: _count(model, "task") for field, model in TASK_COUNTERS.items()}
+    return _repair(Task.objects.all(), expected, batch_size, dry_run)
+
+
+def repair_project_counters(batch_size=1000, dry_run=False):
+    expected = {
+        field: _count(Task, "project", status=status)
+        for status, field in Project.TASK_COUNT_FIELDS.items()
+    }
+    return _repair(Project.objects.all(), expected, batch_size, dry_run)
@@ -0,0 +1,150 @@
+from collections import defaultdict, deque
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import F
+
+from .models import Task
+
+TASK_TABLE = Task._meta.db_table
+
+# Both closures use UNION rather than UNION ALL so a cycle left over from
+# before cycles were rejected ends the recursion instead of looping.
+UPSTREAM_SQL = f"""
+    WITH RECURSIVE closure(id) AS (
+        SELECT id FROM {TASK_TABLE} WHERE id = %s
+        UNION
+        SELECT t.depends_on_id FROM {TASK_TABLE} t
+        JOIN closure c ON t.id = c.id
+        WHERE t.depends_on_id IS NOT NULL
+    )
+    SELECT t.id, t.depends_on_id FROM closure c JOIN {TASK_TABLE} t ON t.id = c.id
+"""
+
+DOWNSTREAM_SQL = f"""
+    WITH RECURSIVE closure(id) AS (
+        SELECT id FROM {TASK_TABLE} WHERE depends_on_id = %s
+        UNION
+        SELECT t.id FROM {TASK_TABLE} t JOIN closure c ON t.depends_on_id = c.id
+    )
+    SELECT t.id, t.depends_on_id FROM closure c JOIN {TASK_TABLE} t ON t.id = c.id
+"""
+
+
+class DependencyCycleError(ValueError):
+    pass
+
+
+def _edges(sql, task_id):
+    """Run a closure query and return ``{id: depends_on_id}``."""
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [task_id])
+        return dict(cursor.fetchall())
+
+
+def upstream(task_id):
+    """Ids of every task ``task_id`` transitively depends on, nearest first."""
+    parents = _edges(UPSTREAM_SQL, task_id)
+    chain, seen = [], {task_id}
+    pk = parents.get(task_id)
+    while pk is not None and pk not in seen:
+        chain.append(pk)
+        seen.add(pk)
+        pk = parents.get(pk)
+    return chain
+
+
+def downstream(task_id):
+    """``{id: depends_on_id}`` for every task that transitively depends on
+    ``task_id``, in breadth-first order."""
+    parents = _edges(DOWNSTREAM_SQL, task_id)
+    children = defaultdict(list)
+    for pk, parent in sorted(parents.items()):
+        children[parent].append(pk)
+    ordered, queue = {}, deque(children[task_id])
+    while queue:
+        pk = queue.popleft()
+        if pk not in ordered and pk != task_id:
+            ordered[pk] = parents[pk]
+            queue.extend(children[pk])
+    return ordered
+
+
+def check_dependency(task_id, depends_on_id):
+    """Raise DependencyCycleError if ``task_id -> depends_on_id`` closes a loop.
+
+    A cycle exists exactly when ``task_id`` is ``depends_on_id`` itself or one
+    of its upstream tasks, so this is a walk up one chain. ``task_id`` and
+    that chain are first locked with a no-op UPDATE (as ``Task.save`` does),
+    re-reading the chain until every row on it is locked, so two updates
+    that would close a loop between them run in turn. Call inside the
+    transaction that saves the new dependency.
+    """
+    locked = set()
+    while True:
+        chain = upstream(depends_on_id)
+        rows = {task_id, depends_on_id, *chain}
+        if rows <= locked:
+            break
+        Task.objects.filter(id__in=rows - locked).update(depends_on=F("depends_on"))
+        locked |= rows
+    if task_id == depends_on_id or task_id in chain:
+        raise DependencyCycleError("Dependency would create a cycle")
+
+
+def project_graph(project_id):
+    """Load the dependency graph of a project in one query.
+
+    Returns ``[(id, depends_on_id, estimated_hours)]`` ordered by id. Only
+    the three columns needed are read, so this stays cheap for projects
+    with tens of thousands of tasks.
+    """
+    return list(
+        Task.objects.filter(project_id=project_id)
+        .order_by("id")
+        .values_list("id", "depends_on_id", "estimated_hours")
+    )
+
+
+def schedule(graph):
+    """Topologically order ``graph`` and find its critical path.
+
+    Each task depends on at most one other, so the graph is a forest: a
+    breadth-first walk from the roots yields a topological order and the
+    earliest finish of every task (its chain's summed ``estimated_hours``,
+    missing estimates counting as zero). The critical path is the chain
+    ending at the latest finish. Dependencies on tasks outside the graph
+    are treated as already met. Tasks on a leftover cycle cannot be
+    ordered and are returned separately.
+
+    Returns ``(order, critical_path, total_hours, cyclic_ids)``.
+    """
+    hours = {pk: estimate or Decimal(0) for pk, _, estimate in graph}
+    parents = {pk: parent for pk, parent, _ in graph}
+    children = defaultdict(list)
+    roots = []
+    for pk, parent, _ in graph:
+        if parent in hours:
+            children[parent].append(pk)
+        else:
+            roots.append(pk)
+
+    order, finish = [], {}
+    queue = deque(roots)
+    while queue:
+        pk = queue.popleft()
+        parent = parents[pk]
+        finish[pk] = finish.get(parent, Decimal(0)) + hours[pk]
+        order.append(pk)
+        queue.extend(children[pk])
+
+    cyclic_ids = [pk for pk in hours if pk not in finish]
+    if not order:
+        return order, [], Decimal(0), cyclic_ids
+
+    end = max(order, key=lambda pk: finish[pk])
+    path = [end]
+    while parents[path[-1]] in finish:
+        path.append(parents[path[-1]])
+    path.reverse()
+    return order, path, finish[end], cyclic_ids
@@ -0,0 +1,152 @@
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _Slice:
+    """A file object that stops after ``length`` bytes."""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size) if size else b""
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Parse a single-range ``Range`` header against a file of ``size`` bytes.
+
+    Returns ``(start, end)`` (inclusive), None when the header should be
+    ignored (absent, malformed or multi-range, which RFC 9110 lets a server
+    answer with the whole file), or ``False`` when it is unsatisfiable.
+    """
+    match = RANGE_RE.match(header or "")
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if not length:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start > end:
+        return False if start >= size or not last else None
+    return start, end
+
+
+def attachment_etag(attachment, stat):
+    """Blobs are content-addressed, so their digest is a strong ETag; older
+    attachments fall back to size and modification time."""
+    if attachment.sha256:
+        return f'"{attachment.sha256}"'
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _offload(attachment, headers):
+    """Hand the transfer to the front-end server, if one is configured.
+
+    With X-Accel-Redirect (nginx) ``ATTACHMENT_OFFLOAD_PREFIX`` must name an
+    ``internal`` location aliased to MEDIA_ROOT; with X-Sendfile (Apache,
+    lighttpd) the absolute path is sent. Either way the server handles
+    Range itself and no worker streams the bytes.
+    """
+    mode = getattr(settings, "ATTACHMENT_OFFLOAD", None)
+    if mode == "x-accel-redirect":
+        prefix = settings.ATTACHMENT_OFFLOAD_PREFIX.rstrip("/")
+        header = ("X-Accel-Redirect", f"{prefix}/{quote(attachment.file.name)}")
+    elif mode == "x-sendfile":
+        header = ("X-Sendfile", attachment.file.path)
+    else:
+        return None
+    response = HttpResponse(headers=headers)
+    response.headers[header[0]] = header[1]
+    return response
+
+
+def attachment_response(request, attachment):
+    """Serve an attachment's bytes honouring If-None-Match and Range.
+
+    Whole files and open-ended ranges (the usual resume request) are handed
+    to FileResponse as a real file positioned at the start offset, so a
+    WSGI server with ``wsgi.file_wrapper`` sends them with ``sendfile()``.
+    Bounded ranges are streamed in blocks.
+    """
+    path = attachment.file.path
+    stat = os.stat(path)
+    etag = attachment_etag(attachment, stat)
+    content_type = attachment.file_type or "application/octet-stream"
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+    }
+
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        response.headers["ETag"] = etag
+        return response
+
+    response = _offload(
+        attachment,
+        {
+            **headers,
+            "Content-Type": content_type,
+            "Content-Disposition": content_disposition_header(
+                True, attachment.filename
+            ),
+        },
+    )
+    if response is not None:
+        return response
+
+    def file_response(filelike):
+        return FileResponse(
+            filelike,
+            as_attachment=True,
+            filename=attachment.filename,
+            content_type=content_type,
+            headers=headers,
+        )
+
+    size = stat.st_size
+    byte_range = None
+    if request.headers.get("If-Range", etag) == etag:
+        byte_range = parse_range(request.headers.get("Range"), size)
+    if byte_range is False:
+        response = HttpResponse(status=416, headers=headers)
+        response.headers["Content-Range"] = f"bytes */{size}"
+        return response
+
+    file = open(path, "rb")
+    if byte_range is None:
+        response = file_response(file)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        if end < size - 1:
+            response = file_response(_Slice(file, end - start + 1))
+            response.headers["Content-Length"] = end - start + 1
+        else:
+            response = file_response(file)
+        response.status_code = 206
+        response.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
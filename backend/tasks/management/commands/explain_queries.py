@@ -0,0 +1,96 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from projects.projections import project_queryset, visible_projects
+from users.models import CustomUser
+
+from tasks.models import Category, Comment, Task, TaskAttachment
+from tasks.pagination import keyset_order
+from tasks.projections import (
+    TASK_SORT_FIELDS,
+    filter_tasks,
+    task_queryset,
+    visible_tasks,
+)
+
+# SQLite reports "SEARCH <table> ..." when an index narrows the rows and
+# "SCAN <table> [USING [COVERING] INDEX ...]" when it walks all of them; a
+# walk in index order (say, to avoid sorting) still reads every row. Only
+# SEARCH lines pass. PostgreSQL reports "Seq Scan".
+FULL_SCAN = re.compile(r"\bSCAN (?!CONSTANT ROW)|\bSeq Scan\b")
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the queries behind each API endpoint and flag full table scans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            help="ID of the user to build the queries for (defaults to the first user).",
+        )
+        parser.add_argument(
+            "--fail-on-scan",
+            action="store_true",
+            help="Exit with an error if any query does a full table scan.",
+        )
+
+    def handle(self, *args, **options):
+        user = self.get_user(options["user"])
+        flagged = []
+        for label, queryset in self.endpoint_queries(user):
+            plan = queryset.explain()
+            scans = [
+                line.strip() for line in plan.splitlines() if FULL_SCAN.search(line)
+            ]
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(plan)
+            if scans:
+                flagged.append(label)
+                for line in scans:
+                    self.stdout.write(self.style.WARNING(f"  full scan: {line}"))
+            self.stdout.write("")
+
+        if not flagged:
+            self.stdout.write(self.style.SUCCESS("No full table scans found."))
+            return
+        summary = f"{len(flagged)} queries do full table scans: {', '.join(flagged)}"
+        if options["fail_on_scan"]:
+            raise CommandError(summary)
+        self.stdout.write(self.style.WARNING(summary))
+
+    def get_user(self, user_id):
+        users = CustomUser.objects.order_by("id")
+        user = users.filter(id=user_id).first() if user_id else users.first()
+        if user is None:
+            raise CommandError("No user found to build queries for")
+        return user
+
+    def endpoint_queries(self, user):
+        """Yield ``(label, queryset)`` pairs mirroring what the views run."""
+        project = visible_projects(user).order_by("id").first()
+        project_id = project.id if project else 0
+        category = Category.objects.order_by("id").first()
+        task = Task.objects.filter(project_id=project_id).order_by("id").first()
+        task_id = task.id if task else 0
+
+        def tasks(params, sort="-created_at"):
+            queryset = filter_tasks(visible_tasks(user), params)
+            return keyset_order(task_queryset(queryset), sort, TASK_SORT_FIELDS)[:100]
+
+        yield "list_tasks", tasks({})
+        yield "list_tasks ?status", tasks({"status": "todo"})
+        yield "list_tasks ?priority", tasks({"priority": "high"})
+        yield "list_tasks ?category_id", tasks(
+            {"category_id": category.id if category else 0}
+        )
+        yield "list_tasks ?project_id", tasks({"project_id": project_id})
+        yield "list_tasks ?project_id&status", tasks(
+            {"project_id": project_id, "status": "todo"}
+        )
+        yield "list_tasks ?sort=due_date", tasks({}, sort="due_date")
+        yield "list_projects", project_queryset(visible_projects(user))
+        yield "list_comments", Comment.objects.filter(task_id=task_id)
+        yield "list_attachments", TaskAttachment.objects.filter(task_id=task_id)
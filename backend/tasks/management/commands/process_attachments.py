@@ -0,0 +1,85 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from tasks.processing import process_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Sniff, thumbnail and extract text from new attachments on a pool of "
+        "worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes (default: one per CPU).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20,
+            help="Attachments claimed at a time (default 20).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait when the queue is empty (default 5).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue and exit instead of polling forever.",
+        )
+
+    def start_pool(self, workers):
+        # Forked workers must not inherit an open database connection. The
+        # pool forks all of them on its first submit, so run a trivial job
+        # now, before claim() opens a connection again.
+        connections.close_all()
+        executor = ProcessPoolExecutor(max_workers=workers)
+        executor.submit(os.getpid).result()
+        return executor
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--workers and --batch-size must be positive")
+
+        processed = failed = 0
+        # After a worker crash the released rows are retried one at a time,
+        # so a file that kills its worker only uses up its own attempts.
+        isolate = 0
+        executor = self.start_pool(options["workers"])
+        try:
+            while True:
+                try:
+                    done, errors = process_batch(
+                        executor, 1 if isolate else options["batch_size"]
+                    )
+                except BrokenProcessPool:
+                    self.stderr.write("A worker process died; restarting the pool.")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = self.start_pool(options["workers"])
+                    isolate = options["batch_size"]
+                    continue
+                isolate = max(isolate - 1, 0)
+                processed += done
+                failed += errors
+                if done or errors:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+        finally:
+            executor.shutdown()
+        self.stdout.write(
+            self.style.SUCCESS(f"{processed} attachment(s) processed, {failed} failed.")
+        )
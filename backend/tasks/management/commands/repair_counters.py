@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.counters import repair_project_counters, repair_task_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized task and project counters and fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows checked per transaction (default 1000).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many rows have drifted.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive")
+        dry_run = options["dry_run"]
+
+        tasks = repair_task_counters(batch_size, dry_run)
+        projects = repair_project_counters(batch_size, dry_run)
+        verb = "would be repaired" if dry_run else "repaired"
+        self.stdout.write(
+            self.style.SUCCESS(f"{tasks} task(s) and {projects} project(s) {verb}.")
+        )
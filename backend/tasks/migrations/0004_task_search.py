@@ -0,0 +1,96 @@
+from django.db import migrations
+
+# Full-text index over tasks and their comments, keyed by task id (rowid).
+# Kept in sync by triggers so bulk ORM updates and raw SQL are covered too.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE tasks_task_fts USING fts5(
+        title, description, tags, comments, tokenize = 'unicode61'
+    )
+    """,
+    """
+    INSERT INTO tasks_task_fts (rowid, title, description, tags, comments)
+    SELECT t.id, t.title, t.description, t.tags,
+           coalesce((SELECT group_concat(c.content, ' ')
+                     FROM tasks_comment c WHERE c.task_id = t.id), '')
+    FROM tasks_task t
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts (rowid, title, description, tags, comments)
+        VALUES (new.id, new.title, new.description, new.tags, '');
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_update
+    AFTER UPDATE OF title, description, tags ON tasks_task BEGIN
+        UPDATE tasks_task_fts
+        SET title = new.title, description = new.description, tags = new.tags
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+        DELETE FROM tasks_task_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_comment_fts_insert AFTER INSERT ON tasks_comment BEGIN
+        UPDATE tasks_task_fts
+        SET comments = comments || ' ' || new.content
+        WHERE rowid = new.task_id;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_comment_fts_update
+    AFTER UPDATE OF content, task_id ON tasks_comment BEGIN
+        UPDATE tasks_task_fts
+        SET comments = coalesce((SELECT group_concat(content, ' ')
+                                 FROM tasks_comment WHERE task_id = old.task_id), '')
+        WHERE rowid = old.task_id;
+        UPDATE tasks_task_fts
+        SET comments = coalesce((SELECT group_concat(content, ' ')
+                                 FROM tasks_comment WHERE task_id = new.task_id), '')
+        WHERE rowid = new.task_id;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_comment_fts_delete AFTER DELETE ON tasks_comment BEGIN
+        UPDATE tasks_task_fts
+        SET comments = coalesce((SELECT group_concat(content, ' ')
+                                 FROM tasks_comment WHERE task_id = old.task_id), '')
+        WHERE rowid = old.task_id;
+    END
+    """,
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS tasks_comment_fts_delete",
+    "DROP TRIGGER IF EXISTS tasks_comment_fts_update",
+    "DROP TRIGGER IF EXISTS tasks_comment_fts_insert",
+    "DROP TRIGGER IF EXISTS tasks_task_fts_delete",
+    "DROP TRIGGER IF EXISTS tasks_task_fts_update",
+    "DROP TRIGGER IF EXISTS tasks_task_fts_insert",
+    "DROP TABLE IF EXISTS tasks_task_fts",
+]
+
+
+def run(statements):
+    def apply(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0003_task_query_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(run(CREATE_SQL), run(DROP_SQL)),
+    ]
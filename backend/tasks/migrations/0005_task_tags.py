@@ -0,0 +1,135 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The search index is maintained from Python from here on (tasks.signals);
+# triggers referencing tasks_task columns would block this and any later
+# table rebuild on SQLite.
+SEARCH_TRIGGERS = [
+    "tasks_comment_fts_delete",
+    "tasks_comment_fts_update",
+    "tasks_comment_fts_insert",
+    "tasks_task_fts_delete",
+    "tasks_task_fts_update",
+    "tasks_task_fts_insert",
+]
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for name in SEARCH_TRIGGERS:
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def split_tags(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    Tag = apps.get_model("tasks", "Tag")
+    TaskTag = apps.get_model("tasks", "TaskTag")
+
+    names_by_task = {}
+    for task_id, tags in Task.objects.exclude(tags="").values_list("id", "tags"):
+        names = {name.strip().lower()[:50] for name in tags.split(",")}
+        names.discard("")
+        if names:
+            names_by_task[task_id] = names
+
+    all_names = set().union(*names_by_task.values())
+    Tag.objects.bulk_create(
+        [Tag(name=name) for name in all_names], batch_size=1000, ignore_conflicts=True
+    )
+    tag_ids = dict(Tag.objects.values_list("name", "id"))
+    TaskTag.objects.bulk_create(
+        [
+            TaskTag(task_id=task_id, tag_id=tag_ids[name])
+            for task_id, names in names_by_task.items()
+            for name in names
+        ],
+        batch_size=1000,
+    )
+
+
+def join_tags(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    TaskTag = apps.get_model("tasks", "TaskTag")
+
+    names_by_task = {}
+    for task_id, name in TaskTag.objects.order_by("tag__name").values_list(
+        "task_id", "tag__name"
+    ):
+        names_by_task.setdefault(task_id, []).append(name)
+    for task_id, names in names_by_task.items():
+        Task.objects.filter(id=task_id).update(tags=",".join(names)[:200])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0004_task_search"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_search_triggers, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name="Tag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TaskTag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "tag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_tags",
+                        to="tasks.tag",
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_tags",
+                        to="tasks.task",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("tag", "task")},
+            },
+        ),
+        migrations.RunPython(split_tags, join_tags),
+        migrations.RemoveField(
+            model_name="task",
+            name="tags",
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="tags",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="tasks",
+                through="tasks.TaskTag",
+                to="tasks.tag",
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:37
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+TASK_STATUSES = ["todo", "in_progress", "review", "completed", "archived"]
+
+
+def _count(model, column, **filters):
+    rows = (
+        model.objects.filter(**{column: OuterRef("pk")}, **filters)
+        .order_by()
+        .values(column)
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+def populate_counters(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    Project = apps.get_model("projects", "Project")
+    Task.objects.update(
+        comment_count=_count(apps.get_model("tasks", "Comment"), "task"),
+        attachment_count=_count(apps.get_model("tasks", "TaskAttachment"), "task"),
+        assignee_count=_count(apps.get_model("tasks", "TaskAssignment"), "task"),
+    )
+    Project.objects.update(
+        **{
+            f"{status}_task_count": _count(Task, "project", status=status)
+            for status in TASK_STATUSES
+        }
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0003_project_task_counts"),
+        ("tasks", "0005_task_tags"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="assignee_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="attachment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
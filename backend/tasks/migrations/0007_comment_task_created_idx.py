@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0006_task_counters"),
+        ("users", "0003_auth_tokens"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["task", "created_at", "id"], name="comment_task_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,128 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:45
+
+from django.db import migrations, models
+
+# The search table gains an "attachments" column for text the worker
+# extracts. FTS5 tables cannot be altered, so it is rebuilt.
+REBUILD_SQL = [
+    "DROP TABLE IF EXISTS tasks_task_fts",
+    """
+    CREATE VIRTUAL TABLE tasks_task_fts USING fts5(
+        title, description, tags, comments, attachments, tokenize = 'unicode61'
+    )
+    """,
+    """
+    INSERT INTO tasks_task_fts (rowid, title, description, tags, comments, attachments)
+    SELECT t.id, t.title, t.description,
+           coalesce((SELECT group_concat(g.name, ' ')
+                     FROM tasks_tasktag tt
+                     JOIN tasks_tag g ON g.id = tt.tag_id
+                     WHERE tt.task_id = t.id), ''),
+           coalesce((SELECT group_concat(c.content, ' ')
+                     FROM tasks_comment c WHERE c.task_id = t.id), ''),
+           ''
+    FROM tasks_task t
+    """,
+]
+
+RESTORE_SQL = [
+    "DROP TABLE IF EXISTS tasks_task_fts",
+    """
+    CREATE VIRTUAL TABLE tasks_task_fts USING fts5(
+        title, description, tags, comments, tokenize = 'unicode61'
+    )
+    """,
+    """
+    INSERT INTO tasks_task_fts (rowid, title, description, tags, comments)
+    SELECT t.id, t.title, t.description,
+           coalesce((SELECT group_concat(g.name, ' ')
+                     FROM tasks_tasktag tt
+                     JOIN tasks_tag g ON g.id = tt.tag_id
+                     WHERE tt.task_id = t.id), ''),
+           coalesce((SELECT group_concat(c.content, ' ')
+                     FROM tasks_comment c WHERE c.task_id = t.id), '')
+    FROM tasks_task t
+    """,
+]
+
+
+def run(statements):
+    def apply(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0008_attachment_blobs"),
+        ("users", "0003_auth_tokens"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskattachment",
+            name="extracted_text",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="taskattachment",
+            name="metadata",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="taskattachment",
+            name="processed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="taskattachment",
+            name="processing_attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="taskattachment",
+            name="processing_error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="taskattachment",
+            name="processing_ms",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="taskattachment",
+            name="processing_started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="taskattachment",
+            name="processing_state",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("done", "Done"),
+                    ("failed", "Failed"),
+                ],
+                default="pending",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="taskattachment",
+            name="thumbnail",
+            field=models.FileField(blank=True, upload_to="thumbnails/"),
+        ),
+        migrations.AddIndex(
+            model_name="taskattachment",
+            index=models.Index(
+                fields=["processing_state", "id"], name="attachment_state_idx"
+            ),
+        ),
+        migrations.RunPython(run(REBUILD_SQL), run(RESTORE_SQL)),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from projects.models import Project
 from users.models import CustomUser
 
@@ -12,6 +13,13 @@ class Category(models.Model):
         return self.name
 
 
+class Tag(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
 class Task(models.Model):
     PRIORITY_CHOICES = [
         ("low", "Low"),
@@ -49,18 +57,110 @@ class Task(models.Model):
         blank=True,
         related_name="dependent_tasks",
     )
-    tags = models.CharField(max_length=200, blank=True)
+    tags = models.ManyToManyField(
+        Tag, through="TaskTag", related_name="tasks", blank=True
+    )
     estimated_hours = models.DecimalField(
         max_digits=5, decimal_places=2, blank=True, null=True
     )
     actual_hours = models.DecimalField(
         max_digits=5, decimal_places=2, blank=True, null=True
     )
+    # Denormalized counts maintained by tasks.counters.
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    attachment_count = models.PositiveIntegerField(default=0, editable=False)
+    assignee_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="task_created_id_idx"),
+            models.Index(fields=["updated_at", "id"], name="task_updated_id_idx"),
+            models.Index(fields=["due_date", "id"], name="task_due_id_idx"),
+            models.Index(fields=["title", "id"], name="task_title_id_idx"),
+            models.Index(
+                fields=["project", "status", "created_at"],
+                name="task_proj_status_created_idx",
+            ),
+            models.Index(
+                fields=["project", "created_at"], name="task_proj_created_idx"
+            ),
+            models.Index(
+                fields=["status", "created_at"], name="task_status_created_idx"
+            ),
+            models.Index(
+                fields=["priority", "created_at"], name="task_priority_created_idx"
+            ),
+            models.Index(
+                fields=["category", "created_at"], name="task_category_created_idx"
+            ),
+            # Due-date views only ever look at live work, so leave archived
+            # tasks out of these indexes.
+            models.Index(
+                fields=["due_date"],
+                condition=~models.Q(status="archived"),
+                name="task_open_due_idx",
+            ),
+            models.Index(
+                fields=["project", "due_date"],
+                condition=~models.Q(status="archived"),
+                name="task_proj_open_due_idx",
+            ),
+        ]
+
+    # Written only through F() updates in tasks.counters; an ordinary save
+    # must never write back the values it happened to load.
+    COUNTER_FIELDS = ("comment_count", "attachment_count", "assignee_count")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "status" in field_names:
+            instance._loaded_status = instance.status
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using, fields, from_queryset)
+        if (fields is None or "status" in fields) and "status" in self.__dict__:
+            self._loaded_status = self.status
+
+    def save(self, *args, **kwargs):
+        if self._state.adding or kwargs.get("force_insert"):
+            super().save(*args, **kwargs)
+            self._loaded_status = self.status
+            return
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        loaded = self.__dict__.get("_loaded_status")
+        if "status" in update_fields and loaded == self.status:
+            # Unchanged here: leave the stored status (and the project
+            # counters) alone rather than writing back what was loaded.
+            update_fields = [name for name in update_fields if name != "status"]
+        kwargs["update_fields"] = update_fields
+        if "status" not in update_fields:
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            # Swap the status only if it is still the one this instance
+            # loaded; the signal then moves the counters from that value.
+            # On a mismatch, lock the row (a no-op UPDATE works on every
+            # backend, SQLite included) and read what the save replaces.
+            rows = Task.objects.filter(pk=self.pk)
+            if loaded is not None and rows.filter(status=loaded).update(
+                status=self.status
+            ):
+                self._stored_status = loaded
+            else:
+                rows.update(status=F("status"))
+                self._stored_status = rows.values_list("status", flat=True).first()
+            super().save(*args, **kwargs)
+        self._loaded_status = self.status
 
     def __str__(self):
         return self.title
@@ -84,11 +184,26 @@ class TaskAssignment(models.Model):
 
     class Meta:
         unique_together = ["task", "user"]
+        indexes = [
+            models.Index(fields=["user", "task"], name="assignment_user_task_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user} assigned to {self.task}"
 
 
+class TaskTag(models.Model):
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="task_tags")
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name="task_tags")
+
+    class Meta:
+        # Leading with the tag makes ?tag= filters and tag counts index scans.
+        unique_together = ["tag", "task"]
+
+    def __str__(self):
+        return f"{self.task} tagged {self.tag}"
+
+
 class Comment(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="comments")
     author = models.ForeignKey(
@@ -99,20 +214,78 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["task", "created_at", "id"], name="comment_task_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author} on {self.task}"
 
 
+def blob_path(instance, filename):
+    return f"blobs/{instance.sha256[:2]}/{instance.sha256[2:4]}/{instance.sha256}"
+
+
+class AttachmentBlob(models.Model):
+    """The stored bytes of an upload, shared by every identical attachment."""
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.PositiveBigIntegerField()
+    file = models.FileField(upload_to=blob_path)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
+
 class TaskAttachment(models.Model):
+    PROCESSING_CHOICES = [
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="attachments")
     file = models.FileField(upload_to="attachments/")
+    # Null for attachments uploaded before blobs existed.
+    blob = models.ForeignKey(
+        AttachmentBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="attachments",
+    )
+    size = models.PositiveBigIntegerField(null=True, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True)
     filename = models.CharField(max_length=255)
     file_type = models.CharField(max_length=50, blank=True)
     uploaded_by = models.ForeignKey(
         CustomUser, on_delete=models.CASCADE, related_name="uploaded_attachments"
     )
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    # Filled in off the request path by the process_attachments worker.
+    processing_state = models.CharField(
+        max_length=10, choices=PROCESSING_CHOICES, default="pending"
+    )
+    processing_attempts = models.PositiveSmallIntegerField(default=0)
+    processing_started_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    processing_ms = models.PositiveIntegerField(null=True, blank=True)
+    processing_error = models.TextField(blank=True)
+    metadata = models.JSONField(default=dict, blank=True)
+    extracted_text = models.TextField(blank=True)
+    thumbnail = models.FileField(upload_to="thumbnails/", blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["processing_state", "id"], name="attachment_state_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.filename} for {self.task}"
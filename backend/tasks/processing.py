@@ -0,0 +1,277 @@
+import io
+import mimetypes
+import re
+import time
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .blobs import thumbnail_name
+from .models import TaskAttachment
+from .search import index_tasks
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - depends on the environment
+    Image = None
+
+# Leading bytes -> MIME type. Checked before trusting the client's
+# Content-Type or the file extension.
+SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+    (b"PK\x03\x04", "application/zip"),
+    (b"\x1f\x8b", "application/gzip"),
+)
+
+SNIFF_BYTES = 4096
+THUMBNAIL_SIZE = (256, 256)
+MAX_TEXT_CHARS = 100_000
+PDF_PAGE_RE = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+
+# A claim older than this belongs to a worker that died; the row is retried
+# until it has been attempted MAX_ATTEMPTS times, then marked failed.
+STALE_AFTER = timedelta(minutes=10)
+MAX_ATTEMPTS = 3
+ABANDONED_ERROR = "Worker abandoned the job"
+
+
+def sniff_mime(head, filename):
+    """Guess the MIME type from the file's first bytes, then its name."""
+    guessed = mimetypes.guess_type(filename)[0]
+    for signature, mime in SIGNATURES:
+        if head.startswith(signature):
+            # Office documents, jars and the like are zip files too.
+            if mime == "application/zip" and guessed:
+                return guessed
+            return mime
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if b"\x00" not in head:
+        try:
+            head.decode("utf-8")
+        except UnicodeDecodeError as e:
+            # Only a multi-byte character cut off by the sample is allowed.
+            if e.reason != "unexpected end of data":
+                return guessed or "application/octet-stream"
+        if guessed and guessed.startswith("text/"):
+            return guessed
+        return "text/plain"
+    return guessed or "application/octet-stream"
+
+
+def _image_metadata(path):
+    if Image is None:
+        return {}, None
+    with Image.open(path) as image:
+        metadata = {"width": image.width, "height": image.height}
+        image.thumbnail(THUMBNAIL_SIZE)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        thumbnail = io.BytesIO()
+        image.save(thumbnail, "PNG", optimize=True)
+    return metadata, thumbnail.getvalue()
+
+
+def analyze(path, filename):
+    """Derive metadata, searchable text and a thumbnail from a stored file.
+
+    Runs in a worker process: it touches only the file, never the database,
+    so it can be handed to a ProcessPoolExecutor. Returns a dict with
+    ``metadata``, ``text``, ``thumbnail`` (PNG bytes or None) and
+    ``elapsed_ms``.
+    """
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+    mime = sniff_mime(head, filename)
+    metadata, text, thumbnail = {"mime_type": mime}, "", None
+
+    if mime.startswith("image/"):
+        details, thumbnail = _image_metadata(path)
+        metadata.update(details)
+    elif mime == "application/pdf":
+        with open(path, "rb") as f:
+            metadata["page_count"] = len(PDF_PAGE_RE.findall(f.read()))
+    elif mime.startswith("text/") or mime in ("application/json", "application/xml"):
+        with open(path, "rb") as f:
+            raw = f.read(MAX_TEXT_CHARS * 4)
+        text = raw.decode("utf-8", errors="replace")[:MAX_TEXT_CHARS]
+
+    return {
+        "metadata": metadata,
+        "text": text,
+        "thumbnail": thumbnail,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000),
+    }
+
+
+def claim(limit):
+    """Mark up to ``limit`` waiting attachments as processing; return them.
+
+    The rows are selected first and then switched with one conditional
+    UPDATE stamped with a fresh start time, so concurrent workers never
+    claim the same row: each reloads only the rows carrying its own stamp.
+    Stale claims that have used up their attempts are marked failed first,
+    so clients stop waiting on them.
+    """
+    now = timezone.now()
+    stale = Q(
+        processing_state="processing", processing_started_at__lt=now - STALE_AFTER
+    )
+    TaskAttachment.objects.filter(stale, processing_attempts__gte=MAX_ATTEMPTS).update(
+        processing_state="failed", processing_error=ABANDONED_ERROR, processed_at=now
+    )
+    waiting = Q(processing_state="pending") | (
+        stale & Q(processing_attempts__lt=MAX_ATTEMPTS)
+    )
+    ids = list(
+        TaskAttachment.objects.filter(waiting)
+        .order_by("id")
+        .values_list("id", flat=True)[:limit]
+    )
+    if not ids:
+        return []
+    started = timezone.now()
+    TaskAttachment.objects.filter(waiting, id__in=ids).update(
+        processing_state="processing",
+        processing_started_at=started,
+        processing_attempts=F("processing_attempts") + 1,
+    )
+    return list(
+        TaskAttachment.objects.filter(
+            id__in=ids, processing_state="processing", processing_started_at=started
+        ).order_by("id")
+    )
+
+
+def _finish(attachment, **fields):
+    """Record a result unless another worker has reclaimed the row since."""
+    updated = TaskAttachment.objects.filter(
+        id=attachment.id, processing_started_at=attachment.processing_started_at
+    ).update(processed_at=timezone.now(), **fields)
+    if updated and fields.get("extracted_text"):
+        index_tasks([attachment.task_id])
+    return bool(updated)
+
+
+def record_result(attachment, result):
+    thumbnail = ""
+    if result["thumbnail"] is not None:
+        thumbnail = thumbnail_name(attachment.sha256 or f"attachment-{attachment.id}")
+        if not default_storage.exists(thumbnail):
+            thumbnail = default_storage.save(
+                thumbnail, ContentFile(result["thumbnail"])
+            )
+    return _finish(
+        attachment,
+        processing_state="done",
+        processing_ms=result["elapsed_ms"],
+        processing_error="",
+        metadata=result["metadata"],
+        extracted_text=result["text"],
+        thumbnail=thumbnail,
+    )
+
+
+def record_failure(attachment, error):
+    return _finish(
+        attachment,
+        processing_state="failed",
+        processing_error=f"{type(error).__name__}: {error}",
+    )
+
+
+def _reuse(attachment):
+    """Copy the results of an already processed attachment with the same
+    bytes, so duplicate uploads are never analyzed twice."""
+    if not attachment.sha256:
+        return False
+    done = (
+        TaskAttachment.objects.filter(sha256=attachment.sha256, processing_state="done")
+        .exclude(id=attachment.id)
+        .first()
+    )
+    if done is None:
+        return False
+    return _finish(
+        attachment,
+        processing_state="done",
+        processing_ms=0,
+        processing_error="",
+        metadata=done.metadata,
+        extracted_text=done.extracted_text,
+        thumbnail=done.thumbnail.name,
+    )
+
+
+def release(attachments):
+    """Hand claimed rows back to the queue after the pool broke under them.
+
+    A crashed worker takes the whole pool down, so the culprit cannot be
+    told apart from its neighbours: each row goes back to pending, or is
+    marked failed once it has used up its attempts.
+    """
+    for attachment in attachments:
+        claimed = TaskAttachment.objects.filter(
+            id=attachment.id, processing_started_at=attachment.processing_started_at
+        )
+        if attachment.processing_attempts < MAX_ATTEMPTS:
+            claimed.update(processing_state="pending")
+        else:
+            claimed.update(
+                processing_state="failed",
+                processing_error=ABANDONED_ERROR,
+                processed_at=timezone.now(),
+            )
+
+
+def process_batch(executor, limit):
+    """Claim up to ``limit`` attachments and analyze them on ``executor``.
+
+    Database work stays in the calling process; only ``analyze`` runs on
+    the pool, once per distinct blob in the batch. Returns
+    ``(processed, failed)`` counts. Only errors raised by ``analyze`` count
+    as failures: if the pool itself breaks, the unfinished rows are
+    released and BrokenProcessPool is re-raised for the caller to restart
+    the pool.
+    """
+    groups = {}
+    processed = failed = 0
+    for attachment in claim(limit):
+        if _reuse(attachment):
+            processed += 1
+        else:
+            groups.setdefault(attachment.sha256 or attachment.id, []).append(attachment)
+
+    unfinished = list(groups.values())
+    try:
+        futures = [
+            (group, executor.submit(analyze, group[0].file.path, group[0].filename))
+            for group in unfinished
+        ]
+        for group, future in futures:
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                for attachment in group:
+                    record_failure(attachment, e)
+                failed += len(group)
+            else:
+                for attachment in group:
+                    record_result(attachment, result)
+                processed += len(group)
+            unfinished.remove(group)
+    except BaseException:
+        release(attachment for group in unfinished for attachment in group)
+        raise
+    return processed, failed
@@ -0,0 +1,192 @@
+from collections import namedtuple
+
+from django.db.models import Prefetch, Q
+from projects.models import ProjectAccess
+
+from .models import Comment, Tag, Task, TaskAssignment, TaskTag
+
+# Sort keys accepted by list_tasks; each is backed by a ``(field, id)`` index
+# so keyset pages are index range scans.
+TASK_SORT_FIELDS = {"created_at", "updated_at", "due_date", "title"}
+
+# Sort keys accepted by list_comments, backed by the (task, created_at, id)
+# index.
+COMMENT_SORT_FIELDS = {"created_at"}
+
+# columns: what .only() must load; select: relations to join; prefetch: the
+# PREFETCHES it needs; get: how to render the value.
+Field = namedtuple("Field", "columns select prefetch get")
+
+PREFETCHES = {
+    "assignments": lambda: Prefetch(
+        "assignments", queryset=TaskAssignment.objects.select_related("user")
+    ),
+    "tags": lambda: Prefetch("tags", queryset=Tag.objects.order_by("name")),
+}
+
+TASK_FIELDS = {
+    "id": Field(("id",), (), (), lambda t: t.id),
+    "title": Field(("title",), (), (), lambda t: t.title),
+    "description": Field(("description",), (), (), lambda t: t.description),
+    "priority": Field(("priority",), (), (), lambda t: t.priority),
+    "status": Field(("status",), (), (), lambda t: t.status),
+    "category": Field(
+        ("category", "category__name"),
+        ("category",),
+        (),
+        lambda t: t.category.name if t.category else None,
+    ),
+    "due_date": Field(("due_date",), (), (), lambda t: t.due_date),
+    "is_milestone": Field(("is_milestone",), (), (), lambda t: t.is_milestone),
+    "depends_on": Field(("depends_on",), (), (), lambda t: t.depends_on_id),
+    "tags": Field(
+        (),
+        (),
+        ("tags",),
+        lambda t: ",".join(tag.name for tag in t.tags.all()),
+    ),
+    "estimated_hours": Field(("estimated_hours",), (), (), lambda t: t.estimated_hours),
+    "actual_hours": Field(("actual_hours",), (), (), lambda t: t.actual_hours),
+    "project": Field(("project",), (), (), lambda t: t.project_id),
+    "comment_count": Field(("comment_count",), (), (), lambda t: t.comment_count),
+    "attachment_count": Field(
+        ("attachment_count",), (), (), lambda t: t.attachment_count
+    ),
+    "assignee_count": Field(("assignee_count",), (), (), lambda t: t.assignee_count),
+    "created_by": Field(
+        ("created_by", "created_by__email"),
+        ("created_by",),
+        (),
+        lambda t: {"id": t.created_by.id, "email": t.created_by.email},
+    ),
+    "assignees": Field(
+        (),
+        (),
+        ("assignments",),
+        lambda t: [
+            {"id": a.user.id, "email": a.user.email, "status": a.status}
+            for a in t.assignments.all()
+        ],
+    ),
+}
+
+
+def visible_tasks(user):
+    """Tasks in projects the user owns or belongs to, or assigned to them.
+
+    Both halves are semi-joins on indexed ``user``-keyed tables (the
+    materialized ProjectAccess rows and TaskAssignment), so no join fan-out
+    and no DISTINCT is needed.
+    """
+    return Task.objects.filter(
+        Q(project_id__in=ProjectAccess.objects.filter(user=user).values("project_id"))
+        | Q(id__in=TaskAssignment.objects.filter(user=user).values("task_id"))
+    )
+
+
+def filter_tasks(tasks, params):
+    """Apply the list_tasks query-string filters."""
+    status_filter = params.get("status")
+    priority_filter = params.get("priority")
+    category_id = params.get("category_id")
+    project_id = params.get("project_id")
+    tag = params.get("tag")
+
+    if status_filter:
+        tasks = tasks.filter(status=status_filter)
+    if priority_filter:
+        tasks = tasks.filter(priority=priority_filter)
+    if category_id:
+        tasks = tasks.filter(category_id=category_id)
+    if project_id:
+        tasks = tasks.filter(project_id=project_id)
+    if tag:
+        tasks = tasks.filter(
+            id__in=TaskTag.objects.filter(tag__name=tag.strip().lower()).values(
+                "task_id"
+            )
+        )
+    return tasks
+
+
+def task_queryset(queryset=None, fields=None):
+    """Attach every relation the task serializer touches.
+
+    The number of queries stays fixed regardless of how many tasks are
+    returned: one for the tasks (with category and creator joined in), one
+    for all of their assignments (with the assigned users joined in) and one
+    for all of their tags.
+
+    When ``fields`` is given only those columns are loaded (plus the id and
+    sort keys pagination needs) and unused joins and prefetches are skipped.
+    """
+    if queryset is None:
+        queryset = Task.objects.all()
+    selected = [TASK_FIELDS[name] for name in fields or TASK_FIELDS]
+    select = {rel for field in selected for rel in field.select}
+    if select:
+        queryset = queryset.select_related(*sorted(select))
+    if fields is not None:
+        columns = {"id", *TASK_SORT_FIELDS}
+        columns.update(col for field in selected for col in field.columns)
+        queryset = queryset.only(*sorted(columns))
+    prefetch = {name for field in selected for name in field.prefetch}
+    if prefetch:
+        queryset = queryset.prefetch_related(
+            *(PREFETCHES[name]() for name in sorted(prefetch))
+        )
+    return queryset
+
+
+def task_serializer(fields=None):
+    """Build a serializer emitting only ``fields`` (all fields by default)."""
+    getters = [(name, TASK_FIELDS[name].get) for name in fields or TASK_FIELDS]
+
+    def serialize(t):
+        return {name: get(t) for name, get in getters}
+
+    return serialize
+
+
+serialize_task = task_serializer()
+
+
+def get_serialized_task(task_id):
+    """Reload a single task through the projection and serialize it."""
+    return serialize_task(task_queryset(Task.objects.filter(id=task_id)).get())
+
+
+def comment_queryset(task_id):
+    """Comments of a task with their authors joined in, in one query."""
+    return (
+        Comment.objects.filter(task_id=task_id)
+        .select_related("author")
+        .only("id", "task_id", "content", "created_at", "author__id", "author__email")
+    )
+
+
+def serialize_comment(c):
+    return {
+        "id": c.id,
+        "task_id": c.task_id,
+        "author": {"id": c.author.id, "email": c.author.email},
+        "content": c.content,
+        "created_at": c.created_at,
+    }
+
+
+def serialize_attachment(a):
+    return {
+        "id": a.id,
+        "task_id": a.task_id,
+        "filename": a.filename,
+        "file_type": a.file_type,
+        "file_url": a.file.url,
+        "size": a.size,
+        "sha256": a.sha256,
+        "processing_state": a.processing_state,
+        "metadata": a.metadata,
+        "thumbnail_url": a.thumbnail.url if a.thumbnail else None,
+        "uploaded_by": {"id": a.uploaded_by.id, "email": a.uploaded_by.email},
+        "uploaded_at": a.uploaded_at,
+    }
@@ -0,0 +1,117 @@
+from users.validation import (
+    Field,
+    Integer,
+    IntegerList,
+    Object,
+    Schema,
+    SchemaError,
+    String,
+    from_model,
+)
+
+from .models import Category, Comment, Tag, Task
+from .tags import parse_tags
+
+
+class Tags(Field):
+    """A comma-separated string or a list of tag names, normalized."""
+
+    def convert(self, value):
+        if isinstance(value, list):
+            if not all(isinstance(name, str) for name in value):
+                raise SchemaError("must be a string or a list of strings")
+        elif not isinstance(value, str):
+            raise SchemaError("must be a string or a list of strings")
+        return parse_tags(value)
+
+
+# Writable task attributes shared by create and update.
+TASK_FIELDS = {
+    "description": from_model(Task, "description"),
+    "priority": from_model(Task, "priority"),
+    "status": from_model(Task, "status"),
+    "category_id": from_model(Task, "category"),
+    "due_date": from_model(Task, "due_date"),
+    "is_milestone": from_model(Task, "is_milestone"),
+    "depends_on_id": from_model(Task, "depends_on"),
+    "estimated_hours": from_model(Task, "estimated_hours"),
+    "actual_hours": from_model(Task, "actual_hours"),
+}
+
+TASK_CREATE = Schema(
+    required_error="Project ID and title are required",
+    project_id=from_model(Task, "project", required=True),
+    title=from_model(Task, "title", required=True),
+    tags=Tags(default=()),
+    assignees=IntegerList(default=()),
+    **TASK_FIELDS,
+)
+
+TASK_UPDATE = Schema(
+    title=from_model(Task, "title", blank=False),
+    tags=Tags(null=True),
+    assignees=IntegerList(null=True),
+    **TASK_FIELDS,
+)
+
+MAX_BULK_TASKS = 500
+
+
+class TaskItems(Field):
+    """A non-empty list of task objects; each is validated separately."""
+
+    def convert(self, value):
+        if not isinstance(value, list) or not value:
+            raise SchemaError("A list of tasks is required")
+        if len(value) > MAX_BULK_TASKS:
+            raise SchemaError(f"At most {MAX_BULK_TASKS} tasks per request")
+        return value
+
+
+BULK_CREATE = Schema(
+    required_error="A list of tasks is required",
+    tasks=TaskItems(required=True),
+)
+
+# Fields PATCH /api/tasks/bulk/ may change, and the list_tasks filters
+# accepted as a selection. Unknown keys are errors, not silently ignored.
+BULK_CHANGES = Schema(
+    strict=True,
+    status=from_model(Task, "status"),
+    priority=from_model(Task, "priority"),
+    due_date=from_model(Task, "due_date"),
+    is_milestone=from_model(Task, "is_milestone"),
+)
+
+BULK_FILTER = Schema(
+    strict=True,
+    status=from_model(Task, "status"),
+    priority=from_model(Task, "priority"),
+    category_id=Integer(min_value=1),
+    project_id=Integer(min_value=1),
+    tag=String(max_length=Tag._meta.get_field("name").max_length),
+)
+
+BULK_UPDATE = Schema(
+    required_error="changes must be a non-empty object",
+    changes=Object(BULK_CHANGES, required=True),
+    ids=IntegerList(max_items=MAX_BULK_TASKS),
+    filter=Object(BULK_FILTER),
+)
+
+ASSIGNEES = Schema(
+    required_error="assignees must be a list of user IDs",
+    assignees=IntegerList(required=True),
+)
+
+COMMENT_CREATE = Schema(
+    required_error="Task ID and content are required",
+    task_id=Integer(required=True, min_value=1),
+    content=from_model(Comment, "content", required=True),
+)
+
+CATEGORY_CREATE = Schema(
+    required_error="Name is required",
+    name=from_model(Category, "name", required=True),
+    description=from_model(Category, "description"),
+)
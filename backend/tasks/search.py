@@ -0,0 +1,130 @@
+from django.db import connection
+from django.utils.html import escape
+
+from .projections import filter_tasks, visible_tasks
+
+# bm25() column weights, in tasks_task_fts column order:
+# title, description, tags, comments, attachments.
+COLUMN_WEIGHTS = (10.0, 2.0, 5.0, 1.0, 1.0)
+
+SNIPPET_TOKENS = 12
+
+# snippet() wraps matches in these private-use characters rather than in
+# markup, so the text can be HTML-escaped before <mark> is substituted.
+MATCH_START, MATCH_END = "\ue000", "\ue001"
+
+# Stay well below SQLite's bound-parameter limit when reindexing in bulk.
+INDEX_BATCH_SIZE = 500
+
+
+def search_available():
+    return connection.vendor == "sqlite"
+
+
+def _batches(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), INDEX_BATCH_SIZE):
+        yield ids[start : start + INDEX_BATCH_SIZE]
+
+
+def unindex_tasks(task_ids):
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        for batch in _batches(task_ids):
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(
+                f"DELETE FROM tasks_task_fts WHERE rowid IN ({placeholders})", batch
+            )
+
+
+def index_tasks(task_ids):
+    """Rebuild the search rows of ``task_ids`` from the current data.
+
+    Called from the model signals in ``tasks.signals`` and by write paths
+    that bypass them (bulk inserts, tag changes).
+    """
+    if not search_available():
+        return
+    unindex_tasks(task_ids)
+    with connection.cursor() as cursor:
+        for batch in _batches(task_ids):
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(
+                f"""
+                INSERT INTO tasks_task_fts
+                    (rowid, title, description, tags, comments, attachments)
+                SELECT t.id, t.title, t.description,
+                       coalesce((SELECT group_concat(g.name, ' ')
+                                 FROM tasks_tasktag tt
+                                 JOIN tasks_tag g ON g.id = tt.tag_id
+                                 WHERE tt.task_id = t.id), ''),
+                       coalesce((SELECT group_concat(c.content, ' ')
+                                 FROM tasks_comment c
+                                 WHERE c.task_id = t.id), ''),
+                       coalesce((SELECT group_concat(a.extracted_text, ' ')
+                                 FROM tasks_taskattachment a
+                                 WHERE a.task_id = t.id), '')
+                FROM tasks_task t
+                WHERE t.id IN ({placeholders})
+                """,
+                batch,
+            )
+
+
+def build_match_query(text):
+    """Turn free text into an FTS5 query that ANDs every term.
+
+    Each term is quoted so user input can never be parsed as FTS5 syntax;
+    a trailing ``*`` is kept as a prefix match.
+    """
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def highlight(snippet):
+    """HTML-escape ``snippet`` and mark its matched terms with ``<mark>``."""
+    marked = escape(snippet).replace(MATCH_START, "<mark>")
+    return marked.replace(MATCH_END, "</mark>")
+
+
+def match_tasks(user, text, params, limit):
+    """Return ``[(task_id, rank, snippet)]`` best match first.
+
+    The snippet is HTML-escaped text with matches wrapped in ``<mark>``.
+    Matching, ranking, snippet extraction and the visibility / list filters
+    all happen in one SQL statement, so the cost scales with the number of
+    matching rows rather than the size of the table.
+    """
+    match = build_match_query(text)
+    if not match:
+        return []
+    visible_sql, visible_params = (
+        filter_tasks(visible_tasks(user), params)
+        .order_by()
+        .values("id")
+        .query.sql_with_params()
+    )
+    weights = ", ".join(str(w) for w in COLUMN_WEIGHTS)
+    sql = f"""
+        SELECT rowid, bm25(tasks_task_fts, {weights}) AS rank,
+               snippet(tasks_task_fts, -1, %s, %s, '…', %s)
+        FROM tasks_task_fts
+        WHERE tasks_task_fts MATCH %s AND rowid IN ({visible_sql})
+        ORDER BY rank
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql,
+            [MATCH_START, MATCH_END, SNIPPET_TOKENS, match, *visible_params, limit],
+        )
+        return [
+            (task_id, rank, highlight(snippet))
+            for task_id, rank, snippet in cursor.fetchall()
+        ]
@@ -0,0 +1,93 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from projects.models import Project
+
+from .blobs import release_blob
+from .counters import adjust_status_counts, adjust_task_counts
+from .models import Comment, Task, TaskAssignment, TaskAttachment
+from .search import index_tasks, unindex_tasks
+
+
+def _origin_model(origin):
+    """The model whose ``delete()`` call started a cascade."""
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+def _task_is_going_away(origin):
+    """Whether a delete cascaded from the task (or its project) itself.
+
+    The task row is about to disappear, so its counters and search entry
+    need no update for each of its child rows.
+    """
+    return _origin_model(origin) in (Task, Project)
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, **kwargs):
+    index_tasks([instance.id])
+    # Set by Task.save() from the locked row when the status was written.
+    previous = instance.__dict__.pop("_stored_status", None)
+    if created:
+        adjust_status_counts({(instance.project_id, instance.status): 1})
+    elif previous is not None and previous != instance.status:
+        adjust_status_counts(
+            {
+                (instance.project_id, previous): -1,
+                (instance.project_id, instance.status): 1,
+            }
+        )
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, origin=None, **kwargs):
+    unindex_tasks([instance.id])
+    if _origin_model(origin) is not Project:
+        adjust_status_counts({(instance.project_id, instance.status): -1})
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    index_tasks([instance.task_id])
+    if created:
+        adjust_task_counts("comment_count", {instance.task_id: 1})
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, origin=None, **kwargs):
+    if not _task_is_going_away(origin):
+        index_tasks([instance.task_id])
+        adjust_task_counts("comment_count", {instance.task_id: -1})
+
+
+@receiver(post_save, sender=TaskAttachment)
+def attachment_saved(sender, instance, created, **kwargs):
+    if created:
+        adjust_task_counts("attachment_count", {instance.task_id: 1})
+
+
+@receiver(post_delete, sender=TaskAttachment)
+def attachment_deleted(sender, instance, origin=None, **kwargs):
+    if instance.blob_id is not None:
+        release_blob(instance.blob_id)
+    elif instance.thumbnail:
+        # Only blob thumbnails are shared; this one was made for this row.
+        thumbnail = instance.thumbnail
+        transaction.on_commit(lambda: thumbnail.storage.delete(thumbnail.name))
+    if not _task_is_going_away(origin):
+        adjust_task_counts("attachment_count", {instance.task_id: -1})
+        if instance.extracted_text:
+            index_tasks([instance.task_id])
+
+
+@receiver(post_save, sender=TaskAssignment)
+def assignment_saved(sender, instance, created, **kwargs):
+    if created:
+        adjust_task_counts("assignee_count", {instance.task_id: 1})
+
+
+@receiver(post_delete, sender=TaskAssignment)
+def assignment_deleted(sender, instance, origin=None, **kwargs):
+    if not _task_is_going_away(origin):
+        adjust_task_counts("assignee_count", {instance.task_id: -1})
@@ -0,0 +1,69 @@
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import Task, TaskAssignment
+
+# Statuses that no longer count as outstanding work.
+CLOSED_STATUSES = ("completed", "archived")
+
+
+def task_stats(tasks):
+    """Summarize ``tasks`` with two GROUP BY queries.
+
+    The first groups the tasks by ``(status, priority)`` and sums hours and
+    overdue items per group; there are at most a few dozen groups, which are
+    folded into the totals here. The second counts assignments per user.
+    Neither query returns task rows, so the cost does not grow with the
+    size of the response.
+    """
+    tasks = tasks.order_by()
+    now = timezone.now()
+    overdue = Q(due_date__lt=now) & ~Q(status__in=CLOSED_STATUSES)
+    groups = tasks.values("status", "priority").annotate(
+        count=Count("id"),
+        estimated=Sum("estimated_hours"),
+        actual=Sum("actual_hours"),
+        overdue=Count("id", filter=overdue),
+    )
+
+    stats = {
+        "total": 0,
+        "by_status": dict.fromkeys(dict(Task.STATUS_CHOICES), 0),
+        "by_priority": dict.fromkeys(dict(Task.PRIORITY_CHOICES), 0),
+        "estimated_hours": Decimal(0),
+        "actual_hours": Decimal(0),
+        "overdue": 0,
+    }
+    for group in groups:
+        stats["total"] += group["count"]
+        stats["by_status"][group["status"]] = (
+            stats["by_status"].get(group["status"], 0) + group["count"]
+        )
+        stats["by_priority"][group["priority"]] = (
+            stats["by_priority"].get(group["priority"], 0) + group["count"]
+        )
+        stats["estimated_hours"] += group["estimated"] or 0
+        stats["actual_hours"] += group["actual"] or 0
+        stats["overdue"] += group["overdue"]
+
+    assignees = (
+        TaskAssignment.objects.filter(task__in=tasks.values("id"))
+        .values("user_id", "user__email")
+        .annotate(
+            tasks=Count("id"),
+            open=Count("id", filter=~Q(task__status__in=CLOSED_STATUSES)),
+        )
+        .order_by("user_id")
+    )
+    stats["assignees"] = [
+        {
+            "id": row["user_id"],
+            "email": row["user__email"],
+            "tasks": row["tasks"],
+            "open": row["open"],
+        }
+        for row in assignees
+    ]
+    return stats
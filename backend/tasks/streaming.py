@@ -0,0 +1,94 @@
+import logging
+
+from django.http import StreamingHttpResponse
+from users.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip while streaming; also the prefetch batch size.
+STREAM_CHUNK_SIZE = 500
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+def wants_stream(request):
+    """Return "ndjson", "json" or None depending on the requested mode."""
+    stream = request.GET.get("stream", "").lower()
+    if stream == "ndjson" or NDJSON_CONTENT_TYPE in request.headers.get("Accept", ""):
+        return "ndjson"
+    if stream in ("1", "true", "json"):
+        return "json"
+    return None
+
+
+def _rows(queryset, serialize):
+    try:
+        for obj in queryset.iterator(chunk_size=STREAM_CHUNK_SIZE):
+            yield serialize(obj)
+    except Exception as e:
+        # Headers are already sent, so the status cannot change. Re-raise so
+        # the server aborts the connection instead of the generators below
+        # closing the body as if it were complete.
+        logger.error(f"Streaming error: {str(e)}")
+        raise
+
+
+async def _arows(queryset, serialize):
+    try:
+        async for obj in queryset.aiterator(chunk_size=STREAM_CHUNK_SIZE):
+            yield serialize(obj)
+    except Exception as e:
+        logger.error(f"Streaming error: {str(e)}")
+        raise
+
+
+def _json_head(key):
+    return f'{{"message": "Request processed successfully", "{key}": ['.encode()
+
+
+def _json_array(queryset, serialize, key):
+    yield _json_head(key)
+    separator = b""
+    for row in _rows(queryset, serialize):
+        yield separator + dumps(row)
+        separator = b", "
+    yield b"]}"
+
+
+async def _ajson_array(queryset, serialize, key):
+    yield _json_head(key)
+    separator = b""
+    async for row in _arows(queryset, serialize):
+        yield separator + dumps(row)
+        separator = b", "
+    yield b"]}"
+
+
+def _ndjson(queryset, serialize):
+    for row in _rows(queryset, serialize):
+        yield dumps(row) + b"\n"
+
+
+async def _andjson(queryset, serialize):
+    async for row in _arows(queryset, serialize):
+        yield dumps(row) + b"\n"
+
+
+def streaming_response(queryset, serialize, key, mode, asynchronous=False):
+    """Stream ``queryset`` as JSON without materializing it.
+
+    Rows are pulled from the database ``STREAM_CHUNK_SIZE`` at a time and
+    written out as they are serialized, so memory use is bounded by the
+    chunk size rather than the result size. ``mode="json"`` produces the same
+    envelope as the buffered endpoint; ``mode="ndjson"`` writes one object
+    per line.
+
+    Pass ``asynchronous=True`` when serving over ASGI: the body is then an
+    async iterator fed by ``aiterator()``. Django buffers whichever kind of
+    iterator does not match the server, so pick by the request type.
+    """
+    if mode == "ndjson":
+        content = (_andjson if asynchronous else _ndjson)(queryset, serialize)
+        return StreamingHttpResponse(content, content_type=NDJSON_CONTENT_TYPE)
+    content = (_ajson_array if asynchronous else _json_array)(queryset, serialize, key)
+    return StreamingHttpResponse(content, content_type="application/json")
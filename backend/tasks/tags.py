@@ -0,0 +1,39 @@
+from .models import Tag, TaskTag
+from .search import index_tasks
+
+MAX_TAG_LENGTH = Tag._meta.get_field("name").max_length
+
+
+def parse_tags(value):
+    """Normalize a comma-separated string or a list of tag names."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    names = (str(name).strip().lower()[:MAX_TAG_LENGTH] for name in value)
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def tag_ids_for(names):
+    """Return ``{name: id}`` for ``names``, creating missing tags."""
+    names = set(names)
+    if not names:
+        return {}
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    return dict(Tag.objects.filter(name__in=names).values_list("name", "id"))
+
+
+def set_task_tags(task_id, names):
+    """Make ``names`` the exact tag set of the task, touching only the diff."""
+    wanted = set(tag_ids_for(names).values())
+    current = set(
+        TaskTag.objects.filter(task_id=task_id).values_list("tag_id", flat=True)
+    )
+    if current - wanted:
+        TaskTag.objects.filter(task_id=task_id, tag_id__in=current - wanted).delete()
+    if wanted - current:
+        TaskTag.objects.bulk_create(
+            [TaskTag(task_id=task_id, tag_id=tag_id) for tag_id in wanted - current]
+        )
+    if wanted != current:
+        index_tasks([task_id])
@@ -1,3 +1,1272 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+from asgiref.sync import sync_to_async
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from projects.models import Project
+from users.models import CustomUser
+from users.tokens import authenticate_token, issue_token, token_cache
+
+from .management.commands.explain_queries import FULL_SCAN
+from .models import (
+    AttachmentBlob,
+    Category,
+    Comment,
+    Tag,
+    Task,
+    TaskAssignment,
+    TaskAttachment,
+)
+from .processing import MAX_ATTEMPTS, STALE_AFTER, claim, process_batch
+from .streaming import streaming_response
+from .tags import set_task_tags
+
+
+def make_user(name):
+    user = CustomUser.objects.create(
+        username=name,
+        email=f"{name}@example.com",
+        first_name=name,
+        last_name="Test",
+        password="secret",
+    )
+    user.token = issue_token(user)
+    return user
+
+
+class TaskApiTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user("owner")
+        cls.member = make_user("member")
+        cls.project = Project.objects.create(name="Apollo", owner=cls.owner)
+        cls.project.members.add(cls.member)
+        cls.category = Category.objects.create(name="Backend")
+
+    def setUp(self):
+        # Warm the token cache so query counts only cover the endpoint itself.
+        token_cache.clear()
+        authenticate_token(self.owner.token)
+
+    def auth(self, user=None):
+        user = user or self.owner
+        return {"HTTP_AUTHORIZATION": f"Bearer {user.token}"}
+
+    def make_tasks(self, count, **kwargs):
+        tasks = []
+        for i in range(count):
+            task = Task.objects.create(
+                project=self.project,
+                title=f"Task {i}",
+                created_by=self.owner,
+                category=self.category,
+                depends_on=tasks[-1] if tasks else None,
+                **kwargs,
+            )
+            TaskAssignment.objects.create(task=task, user=self.member)
+            tasks.append(task)
+        return tasks
+
+
+class ListTasksQueryCountTests(TaskApiTestCase):
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("tasks:list_tasks"), **self.auth())
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()["tasks"]
+
+    def test_query_count_is_independent_of_row_count(self):
+        self.make_tasks(2)
+        small_count, small_tasks = self.count_list_queries()
+        self.make_tasks(25)
+        large_count, large_tasks = self.count_list_queries()
+
+        self.assertEqual(len(small_tasks), 2)
+        self.assertEqual(len(large_tasks), 27)
+        self.assertEqual(small_count, large_count)
+
+    def test_serialized_shape(self):
+        first, second = self.make_tasks(2)
+        _, tasks = self.count_list_queries()
+        by_id = {t["id"]: t for t in tasks}
+
+        self.assertEqual(by_id[second.id]["depends_on"], first.id)
+        self.assertEqual(by_id[second.id]["category"], "Backend")
+        self.assertEqual(by_id[second.id]["project"], self.project.id)
+        self.assertEqual(by_id[second.id]["created_by"]["email"], self.owner.email)
+        self.assertEqual(
+            by_id[second.id]["assignees"],
+            [{"id": self.member.id, "email": self.member.email, "status": "pending"}],
+        )
+
+
+class CreateTaskTests(TaskApiTestCase):
+    def test_create_task_response_uses_projection(self):
+        response = self.client.post(
+            reverse("tasks:create_task"),
+            data={
+                "project_id": self.project.id,
+                "title": "New",
+                "category_id": self.category.id,
+                "assignees": [self.member.id],
+            },
+            content_type="application/json",
+            **self.auth(),
+        )
+        self.assertEqual(response.status_code, 201)
+        task = response.json()["task"]
+        self.assertEqual(task["category"], "Backend")
+        self.assertEqual(task["assignees"][0]["id"], self.member.id)
+
+
+class ListTasksPaginationTests(TaskApiTestCase):
+    def fetch_all(self, **params):
+        seen, cursor, pages = [], None, 0
+        while True:
+            query = dict(params)
+            if cursor:
+                query["cursor"] = cursor
+            response = self.client.get(
+                reverse("tasks:list_tasks"), query, **self.auth()
+            )
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            seen.extend(t["id"] for t in body["tasks"])
+            pages += 1
+            cursor = body["next_cursor"]
+            if not cursor:
+                return seen, pages
+
+    def test_pages_cover_every_task_once(self):
+        tasks = self.make_tasks(7)
+        ids, pages = self.fetch_all(limit=3)
+        self.assertEqual(pages, 3)
+        self.assertEqual(ids, [t.id for t in reversed(tasks)])
+
+    def test_nullable_sort_key_orders_nulls_last(self):
+        tasks = self.make_tasks(5)
+        Task.objects.filter(id__in=[tasks[1].id, tasks[3].id]).update(
+            due_date="2030-01-01T00:00:00Z"
+        )
+        ids, _ = self.fetch_all(limit=2, sort="due_date")
+        self.assertEqual(
+            ids,
+            [tasks[1].id, tasks[3].id, tasks[0].id, tasks[2].id, tasks[4].id],
+        )
+
+    def test_rejects_unknown_sort_and_bad_cursor(self):
+        response = self.client.get(
+            reverse("tasks:list_tasks"), {"sort": "description"}, **self.auth()
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            reverse("tasks:list_tasks"), {"cursor": "garbage"}, **self.auth()
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ListTasksStreamingTests(TaskApiTestCase):
+    def test_json_stream_matches_envelope(self):
+        tasks = self.make_tasks(4)
+        response = self.client.get(
+            reverse("tasks:list_tasks"), {"stream": "1", "limit": 1}, **self.auth()
+        )
+        self.assertTrue(response.streaming)
+        body = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(body["message"], "Request processed successfully")
+        self.assertEqual([t["id"] for t in body["tasks"]], [t.id for t in tasks][::-1])
+        self.assertEqual(body["tasks"][0]["assignees"][0]["id"], self.member.id)
+
+    def test_failure_mid_stream_is_not_closed_as_complete(self):
+        self.make_tasks(3)
+
+        def serialize(task):
+            if task.title == "Task 1":
+                raise ValueError("boom")
+            return {"id": task.id}
+
+        response = streaming_response(
+            Task.objects.order_by("id"), serialize, "tasks", "json"
+        )
+        body = []
+        with self.assertLogs("tasks.streaming", "ERROR"):
+            with self.assertRaises(ValueError):
+                for chunk in response.streaming_content:
+                    body.append(chunk)
+        self.assertFalse(b"".join(body).endswith(b"]}"))
+
+    def test_ndjson_stream_via_accept_header(self):
+        self.make_tasks(3)
+        response = self.client.get(
+            reverse("tasks:list_tasks"),
+            HTTP_ACCEPT="application/x-ndjson",
+            **self.auth(),
+        )
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])["category"], "Backend")
+
+
+class ListTasksFieldsTests(TaskApiTestCase):
+    def test_sparse_fields_skip_columns_and_prefetch(self):
+        self.make_tasks(3)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(
+                reverse("tasks:list_tasks"),
+                {"fields": "id,title,status,due_date"},
+                **self.auth(),
+            )
+        self.assertEqual(response.status_code, 200)
+        task = response.json()["tasks"][0]
+        self.assertEqual(set(task), {"id", "title", "status", "due_date"})
+        # the ETag fingerprint and the task page only: no prefetches
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertNotIn("description", ctx.captured_queries[-1]["sql"])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(
+            reverse("tasks:list_tasks"), {"fields": "id,secret"}, **self.auth()
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ExplainQueriesCommandTests(TaskApiTestCase):
+    def test_reports_a_plan_for_each_endpoint(self):
+        self.make_tasks(2)
+        out = StringIO()
+        call_command("explain_queries", user=self.owner.id, stdout=out)
+        output = out.getvalue()
+        for label in ("list_tasks", "list_projects", "list_comments"):
+            self.assertIn(label, output)
+
+    def test_index_walks_count_as_full_scans(self):
+        for line in (
+            "SCAN tasks_task",
+            "SCAN tasks_task USING INDEX task_created_id_idx",
+            "SCAN U0 USING COVERING INDEX assignment_user_task_idx",
+            "Seq Scan on tasks_task",
+        ):
+            self.assertTrue(FULL_SCAN.search(line), line)
+        for line in (
+            "SEARCH tasks_task USING INDEX task_category_created_idx (category_id=?)",
+            "SEARCH tasks_task USING INTEGER PRIMARY KEY (rowid=?)",
+            "SCAN CONSTANT ROW",
+        ):
+            self.assertFalse(FULL_SCAN.search(line), line)
+
+
+class ProjectAuthorizationTests(TaskApiTestCase):
+    def post_comment(self, user, task):
+        return self.client.post(
+            reverse("tasks:create_comment"),
+            data={"task_id": task.id, "content": "Looks good"},
+            content_type="application/json",
+            **self.auth(user),
+        )
+
+    def test_membership_check_does_not_scale_with_member_count(self):
+        (task,) = self.make_tasks(1)
+        authenticate_token(self.member.token)
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self.post_comment(self.member, task).status_code, 201)
+
+        self.project.members.add(*(make_user(f"extra{i}") for i in range(20)))
+        with CaptureQueriesContext(connection) as large:
+            self.assertEqual(self.post_comment(self.member, task).status_code, 201)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_outsider_is_rejected(self):
+        (task,) = self.make_tasks(1)
+        outsider = make_user("outsider")
+        self.assertEqual(self.post_comment(outsider, task).status_code, 403)
+        response = self.client.get(
+            reverse("tasks:list_attachments", args=[task.id]), **self.auth(outsider)
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class SearchTasksTests(TaskApiTestCase):
+    def search(self, q, user=None):
+        response = self.client.get(
+            reverse("tasks:search_tasks"), {"q": q}, **self.auth(user)
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_matches_title_description_and_comments(self):
+        first, second, third = self.make_tasks(3)
+        first.title = "Migrate billing service"
+        first.save()
+        second.description = "The billing export is slow"
+        second.save()
+        Comment.objects.create(task=third, author=self.owner, content="Billing ok")
+
+        results = self.search("billing")
+        self.assertEqual({r["id"] for r in results}, {first.id, second.id, third.id})
+        # Title matches outrank description and comment matches.
+        self.assertEqual(results[0]["id"], first.id)
+        self.assertIn("<mark>", results[0]["snippet"])
+
+    def test_snippet_escapes_task_content(self):
+        (task,) = self.make_tasks(1)
+        task.title = "hello <script>alert(1)</script> world"
+        task.save()
+        (result,) = self.search("hello")
+        self.assertEqual(
+            result["snippet"],
+            "<mark>hello</mark> &lt;script&gt;alert(1)&lt;/script&gt; world",
+        )
+
+    def test_index_follows_deletes_and_visibility(self):
+        first, second = self.make_tasks(2)
+        Comment.objects.create(task=first, author=self.owner, content="zebra")
+        Comment.objects.filter(task=first).delete()
+        self.assertEqual(self.search("zebra"), [])
+
+        self.assertEqual(len(self.search("Task")), 2)
+        self.assertEqual(self.search("Task", user=make_user("outsider")), [])
+
+    def test_query_syntax_is_escaped(self):
+        self.make_tasks(1)
+        self.assertEqual(self.search('"unbalanced OR ('), [])
+
+
+class TagTests(TaskApiTestCase):
+    def create_task(self, title, tags):
+        response = self.client.post(
+            reverse("tasks:create_task"),
+            data={"project_id": self.project.id, "title": title, "tags": tags},
+            content_type="application/json",
+            **self.auth(),
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()["task"]
+
+    def test_tags_are_normalized_and_round_trip(self):
+        task = self.create_task("One", " Backend, api,backend ,")
+        self.assertEqual(task["tags"], "api,backend")
+        self.assertEqual(Tag.objects.count(), 2)
+
+        response = self.client.put(
+            reverse("tasks:update_task", args=[task["id"]]),
+            data={"tags": ["api", "urgent"]},
+            content_type="application/json",
+            **self.auth(),
+        )
+        self.assertEqual(response.json()["task"]["tags"], "api,urgent")
+
+    def test_tag_filter_and_cloud(self):
+        one = self.create_task("One", "api,backend")
+        self.create_task("Two", "api")
+        other = Project.objects.create(name="Gemini", owner=self.owner)
+        task = Task.objects.create(project=other, title="Three", created_by=self.owner)
+        set_task_tags(task.id, ["api"])
+
+        response = self.client.get(
+            reverse("tasks:list_tasks"), {"tag": "Backend"}, **self.auth()
+        )
+        self.assertEqual([t["id"] for t in response.json()["tasks"]], [one["id"]])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("tasks:tag_cloud"), **self.auth())
+        api, backend = response.json()["tags"]
+        self.assertEqual(api["name"], "api")
+        self.assertEqual(api["count"], 3)
+        self.assertEqual(api["projects"], {str(self.project.id): 2, str(other.id): 1})
+        self.assertEqual(backend["count"], 1)
+
+    def test_tags_are_searchable(self):
+        task = self.create_task("One", "kubernetes")
+        response = self.client.get(
+            reverse("tasks:search_tasks"), {"q": "kubernetes"}, **self.auth()
+        )
+        self.assertEqual([r["id"] for r in response.json()["results"]], [task["id"]])
+
+
+class ConditionalListTests(TaskApiTestCase):
+    def get(self, url, **headers):
+        return self.client.get(url, **headers, **self.auth())
+
+    def test_unchanged_listing_returns_304_without_serializing(self):
+        (task,) = self.make_tasks(1)
+        url = reverse("tasks:list_tasks")
+        etag = self.get(url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        task.title = "Renamed"
+        task.save()
+        response = self.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_etag_depends_on_query_and_deletions(self):
+        first, second = self.make_tasks(2)
+        url = reverse("tasks:list_tasks")
+        etag = self.get(url)["ETag"]
+        self.assertNotEqual(self.get(url + "?fields=id")["ETag"], etag)
+
+        first.delete()
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_comment_listing(self):
+        (task,) = self.make_tasks(1)
+        url = reverse("tasks:list_comments", args=[task.id])
+        etag = self.get(url)["ETag"]
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Comment.objects.create(task=task, author=self.owner, content="New")
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class CommentPaginationTests(TaskApiTestCase):
+    def setUp(self):
+        super().setUp()
+        (self.task,) = self.make_tasks(1)
+        self.url = reverse("tasks:list_comments", args=[self.task.id])
+
+    def comment(self, text, author=None):
+        return Comment.objects.create(
+            task=self.task, author=author or self.member, content=text
+        )
+
+    def get(self, **params):
+        response = self.client.get(self.url, params, **self.auth())
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_in_both_directions_without_per_row_queries(self):
+        comments = [self.comment(f"c{i}", author=make_user(f"a{i}")) for i in range(5)]
+        for sort, expected in (
+            ("-created_at", comments[::-1]),
+            ("created_at", comments),
+        ):
+            seen, cursor = [], None
+            while True:
+                params = {"sort": sort, "limit": 2}
+                if cursor:
+                    params["cursor"] = cursor
+                with self.assertNumQueries(5):
+                    body = self.get(**params)
+                seen.extend(c["content"] for c in body["comments"])
+                cursor = body["next_cursor"]
+                if not cursor:
+                    break
+            self.assertEqual(seen, [c.content for c in expected])
+
+    def test_since_returns_only_newer_comments(self):
+        self.comment("old")
+        body = self.get()
+        self.assertEqual(self.get(since=body["poll_cursor"])["comments"], [])
+
+        self.comment("new")
+        self.comment("newer")
+        polled = self.get(since=body["poll_cursor"])
+        self.assertEqual([c["content"] for c in polled["comments"]], ["new", "newer"])
+        empty = self.get(since=polled["poll_cursor"])
+        self.assertEqual(empty["comments"], [])
+        self.assertEqual(empty["poll_cursor"], polled["poll_cursor"])
+
+    def test_rejects_bad_cursors(self):
+        self.comment("one")
+        cursor = self.get(sort="-created_at", limit=1)["poll_cursor"]
+        for params in (
+            {"since": "garbage"},
+            {"sort": "content"},
+            {"since": cursor, "cursor": cursor},
+            {"sort": "-created_at", "cursor": cursor},
+        ):
+            response = self.client.get(self.url, params, **self.auth())
+            self.assertEqual(response.status_code, 400, params)
+
+
+class TaskSchemaTests(TaskApiTestCase):
+    def test_bad_payloads_are_rejected_before_any_query(self):
+        url = reverse("tasks:create_task")
+        for body in (
+            {"title": "No project"},
+            {"project_id": self.project.id, "title": "T", "priority": "whenever"},
+            {"project_id": self.project.id, "title": "T", "due_date": "soon"},
+            {"project_id": self.project.id, "title": "T", "estimated_hours": "x"},
+            {"project_id": self.project.id, "title": "T", "assignees": ["a"]},
+        ):
+            with self.assertNumQueries(0):
+                response = self.client.post(
+                    url, data=body, content_type="application/json", **self.auth()
+                )
+            self.assertEqual(response.status_code, 400, body)
+
+    def test_update_converts_values_and_keeps_absent_fields(self):
+        task = self.make_tasks(1)[0]
+        response = self.client.put(
+            reverse("tasks:update_task", args=[task.id]),
+            data={"due_date": "2026-05-01T12:00:00+00:00", "estimated_hours": "2.5"},
+            content_type="application/json",
+            **self.auth(),
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()["task"]
+        self.assertEqual(body["due_date"], "2026-05-01T12:00:00+00:00")
+        self.assertEqual(body["estimated_hours"], 2.5)
+        self.assertEqual(body["title"], task.title)
+
+
+class BulkCreateTasksTests(TaskApiTestCase):
+    def bulk_create(self, tasks):
+        return self.client.post(
+            reverse("tasks:bulk_tasks"),
+            data={"tasks": tasks},
+            content_type="application/json",
+            **self.auth(),
+        )
+
+    def item(self, i, **extra):
+        return {
+            "project_id": self.project.id,
+            "title": f"Imported {i}",
+            "category_id": self.category.id,
+            "assignees": [self.member.id],
+            "tags": "import",
+            **extra,
+        }
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self.bulk_create([self.item(0)]).status_code, 201)
+        with CaptureQueriesContext(connection) as large:
+            response = self.bulk_create([self.item(i) for i in range(40)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()["tasks"]), 40)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertEqual(TaskAssignment.objects.count(), 41)
+
+    def test_invalid_items_are_reported_individually(self):
+        outsider_project = Project.objects.create(
+            name="Private", owner=make_user("stranger")
+        )
+        response = self.bulk_create(
+            [
+                self.item(0),
+                {"title": "No project"},
+                self.item(2, project_id=outsider_project.id),
+                self.item(3, priority="whenever"),
+                self.item(4, depends_on_id=999999),
+                "not an object",
+            ]
+        )
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual([t["title"] for t in body["tasks"]], ["Imported 0"])
+        self.assertEqual([e["index"] for e in body["errors"]], [1, 2, 3, 4, 5])
+        self.assertIn("priority", body["errors"][2]["error"])
+
+    def test_bulk_created_tasks_are_searchable(self):
+        self.bulk_create([self.item(0, title="Quarterly roadmap")])
+        response = self.client.get(
+            reverse("tasks:search_tasks"), {"q": "roadmap"}, **self.auth()
+        )
+        self.assertEqual(len(response.json()["results"]), 1)
+
+
+class BulkUpdateTasksTests(TaskApiTestCase):
+    def bulk_update(self, user=None, **body):
+        return self.client.patch(
+            reverse("tasks:bulk_tasks"),
+            data=body,
+            content_type="application/json",
+            **self.auth(user),
+        )
+
+    def test_updates_selected_ids_in_one_statement(self):
+        tasks = self.make_tasks(5)
+        ids = [t.id for t in tasks[:3]]
+        before = Task.objects.get(id=ids[0]).updated_at
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.bulk_update(ids=ids, changes={"status": "completed"})
+        self.assertEqual(response.json()["updated"], ids)
+        updates = [
+            q
+            for q in ctx.captured_queries
+            if q["sql"].startswith('UPDATE "tasks_task"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            set(Task.objects.filter(status="completed").values_list("id", flat=True)),
+            set(ids),
+        )
+        self.assertGreater(Task.objects.get(id=ids[0]).updated_at, before)
+
+    def test_updates_by_filter(self):
+        tasks = self.make_tasks(3)
+        Task.objects.filter(id=tasks[0].id).update(priority="high")
+        response = self.bulk_update(
+            filter={"priority": "high"}, changes={"status": "archived"}
+        )
+        self.assertEqual(response.json()["updated"], [tasks[0].id])
+
+    def test_only_owned_tasks_are_touched_and_input_is_validated(self):
+        tasks = self.make_tasks(2)
+        authenticate_token(self.member.token)
+        response = self.bulk_update(
+            user=self.member, ids=[t.id for t in tasks], changes={"status": "review"}
+        )
+        self.assertEqual(response.json()["updated"], [])
+
+        response = self.bulk_update(ids=[tasks[0].id], changes={"status": "nope"})
+        self.assertEqual(response.status_code, 400)
+        response = self.bulk_update(ids=[tasks[0].id], changes={"title": "x"})
+        self.assertEqual(response.status_code, 400)
+        response = self.bulk_update(changes={"status": "review"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_body_is_checked_against_the_schema(self):
+        (task,) = self.make_tasks(1)
+        for body in (
+            {"filter": {"tag": 5}, "changes": {"status": "review"}},
+            {"filter": {"owner": "me"}, "changes": {"status": "review"}},
+            {"ids": [True], "changes": {"status": "review"}},
+            {"ids": [task.id], "changes": {"is_milestone": "yes"}},
+            {"ids": [task.id], "changes": {}},
+        ):
+            response = self.bulk_update(**body)
+            self.assertEqual(response.status_code, 400, body)
+
+        response = self.bulk_update(
+            ids=[task.id], changes={"due_date": "2030-01-01 10:00"}
+        )
+        self.assertEqual(response.status_code, 200)
+        task.refresh_from_db()
+        self.assertTrue(timezone.is_aware(task.due_date))
+        self.assertEqual(task.due_date.hour, 10)
+
+
+class TaskAssigneesTests(TaskApiTestCase):
+    def assignees(self, method, task, user_ids):
+        return getattr(self.client, method)(
+            reverse("tasks:task_assignees", args=[task.id]),
+            data={"assignees": user_ids},
+            content_type="application/json",
+            **self.auth(),
+        )
+
+    def test_add_and_remove_touch_only_the_difference(self):
+        task = self.make_tasks(1)[0]
+        other = make_user("other")
+        kept = TaskAssignment.objects.get(task=task, user=self.member)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.assignees("post", task, [self.member.id, other.id, 9999])
+        self.assertEqual(response.json()["added"], [other.id])
+        writes = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if q["sql"].startswith(("INSERT", "DELETE"))
+        ]
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(TaskAssignment.objects.filter(id=kept.id).exists())
+
+        extra = [make_user(f"extra{i}").id for i in range(5)]
+        self.assignees("post", task, extra)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.assignees("delete", task, [other.id, *extra])
+        self.assertEqual(response.json()["removed"], sorted([other.id, *extra]))
+        writes = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if q["sql"].startswith(("UPDATE", "DELETE"))
+        ]
+        self.assertEqual(len(writes), 2)
+        self.assertEqual(list(task.assignments.values_list("id", flat=True)), [kept.id])
+        self.assertEqual(Task.objects.get(id=task.id).assignee_count, 1)
+
+    def test_replace_keeps_unchanged_rows(self):
+        task = self.make_tasks(1)[0]
+        other = make_user("other")
+        kept = TaskAssignment.objects.get(task=task, user=self.member)
+        kept.status = "accepted"
+        kept.save()
+
+        response = self.assignees("put", task, [self.member.id, other.id])
+        self.assertEqual(response.json()["added"], [other.id])
+        self.assertEqual(response.json()["removed"], [])
+        self.assertEqual(TaskAssignment.objects.get(id=kept.id).status, "accepted")
+
+        response = self.assignees("put", task, [other.id])
+        self.assertEqual(response.json()["removed"], [self.member.id])
+
+    def test_update_task_leaves_assignees_alone_unless_given(self):
+        task = self.make_tasks(1)[0]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.put(
+                reverse("tasks:update_task", args=[task.id]),
+                data={"title": "Renamed"},
+                content_type="application/json",
+                **self.auth(),
+            )
+        self.assertEqual(response.status_code, 200)
+        # A title edit neither locks the row nor rewrites the status.
+        task_writes = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if q["sql"].startswith('UPDATE "tasks_task"')
+        ]
+        self.assertEqual(len(task_writes), 1)
+        self.assertNotIn('"status"', task_writes[0])
+        self.assertEqual(task.assignments.count(), 1)
+
+    def test_requires_project_owner(self):
+        task = self.make_tasks(1)[0]
+        response = self.client.post(
+            reverse("tasks:task_assignees", args=[task.id]),
+            data={"assignees": [self.owner.id]},
+            content_type="application/json",
+            **self.auth(self.member),
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class AsyncReadTests(TaskApiTestCase):
+    def headers(self, user=None):
+        user = user or self.owner
+        return {"Authorization": f"Bearer {user.token}"}
+
+    async def test_list_tasks_over_asgi(self):
+        await sync_to_async(self.make_tasks)(3)
+        response = await self.async_client.get(
+            reverse("tasks:list_tasks"), {"limit": 2}, headers=self.headers()
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["tasks"]), 2)
+        self.assertEqual(
+            response.json()["tasks"][0]["assignees"][0]["id"], self.member.id
+        )
+
+        response = await self.async_client.get(
+            reverse("tasks:list_tasks"),
+            {"cursor": response.json()["next_cursor"], "limit": 2},
+            headers={**self.headers(), "If-None-Match": response["ETag"]},
+        )
+        self.assertEqual(len(response.json()["tasks"]), 1)
+
+    async def test_stream_is_an_async_iterator_over_asgi(self):
+        await sync_to_async(self.make_tasks)(3)
+        response = await self.async_client.get(
+            reverse("tasks:list_tasks"), {"stream": "ndjson"}, headers=self.headers()
+        )
+        self.assertTrue(response.is_async)
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 3)
+
+    async def test_comments_and_attachments_over_asgi(self):
+        task = (await sync_to_async(self.make_tasks)(1))[0]
+        await Comment.objects.acreate(task=task, author=self.member, content="Hi")
+        response = await self.async_client.get(
+            reverse("tasks:list_comments", args=[task.id]), headers=self.headers()
+        )
+        self.assertEqual(response.json()["comments"][0]["author"]["id"], self.member.id)
+        self.assertIn("ETag", response)
+
+        response = await self.async_client.get(
+            reverse("tasks:list_attachments", args=[task.id]), headers=self.headers()
+        )
+        self.assertEqual(response.json()["attachments"], [])
+
+    async def test_async_views_reject_bad_tokens(self):
+        response = await self.async_client.get(
+            reverse("tasks:list_tasks"),
+            headers={"Authorization": "Bearer not-a-token"},
+        )
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(reverse("projects:list_projects"))
+        self.assertEqual(response.status_code, 401)
+
+
+class DependencyTests(TaskApiTestCase):
+    def chain(self, hours):
+        tasks = self.make_tasks(len(hours))
+        for task, estimate in zip(tasks, hours):
+            task.estimated_hours = estimate
+            task.save()
+        return tasks
+
+    def test_closures_take_one_query_each(self):
+        a, b, c, d = self.chain([1, 1, 1, 1])
+        side = Task.objects.create(
+            project=self.project, title="Side", created_by=self.owner, depends_on=b
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(
+                reverse("tasks:task_dependencies", args=[b.id]), **self.auth()
+            )
+        body = response.json()
+        self.assertEqual(body["upstream"], [a.id])
+        self.assertEqual(
+            [row["id"] for row in body["downstream"]], [c.id, side.id, d.id]
+        )
+        # access check, task lookup, upstream CTE, downstream CTE
+        self.assertEqual(len(ctx.captured_queries), 4)
+
+    def test_update_rejects_cycles(self):
+        a, b, c = self.chain([1, 1, 1])
+        for target, dependency in ((a, c), (a, a)):
+            response = self.client.put(
+                reverse("tasks:update_task", args=[target.id]),
+                data={"depends_on_id": dependency.id},
+                content_type="application/json",
+                **self.auth(),
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("cycle", response.json()["error"])
+        self.assertIsNone(Task.objects.get(id=a.id).depends_on_id)
+
+    def test_cycle_check_locks_the_chain_before_reading_it(self):
+        a, b, c = self.chain([1, 1, 1])
+        d = self.make_tasks(1)[0]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.put(
+                reverse("tasks:update_task", args=[d.id]),
+                data={"depends_on_id": c.id},
+                content_type="application/json",
+                **self.auth(),
+            )
+        self.assertEqual(response.status_code, 200)
+        sql = [q["sql"] for q in ctx.captured_queries]
+        locks = [i for i, q in enumerate(sql) if '"depends_on_id" = "tasks_task"' in q]
+        closures = [i for i, q in enumerate(sql) if "WITH RECURSIVE" in q]
+        self.assertEqual(len(locks), 1)
+        for task in (a, b, c, d):
+            self.assertIn(str(task.id), sql[locks[0]])
+        # The chain is re-read once locked, all within the saving transaction.
+        self.assertGreater(closures[-1], locks[0])
+        savepoint = next(i for i, q in enumerate(sql) if q.startswith("SAVEPOINT"))
+        self.assertLess(savepoint, closures[0])
+
+    def test_critical_path_and_order(self):
+        a, b, c = self.chain([2, 3, 1])
+        longer = Task.objects.create(
+            project=self.project,
+            title="Long",
+            created_by=self.owner,
+            depends_on=a,
+            estimated_hours=10,
+        )
+        response = self.client.get(
+            reverse("tasks:critical_path", args=[self.project.id]), **self.auth()
+        )
+        body = response.json()
+        self.assertEqual([t["id"] for t in body["critical_path"]], [a.id, longer.id])
+        self.assertEqual(body["total_hours"], 12.0)
+
+        response = self.client.get(
+            reverse("tasks:task_order", args=[self.project.id]), **self.auth()
+        )
+        order = response.json()["order"]
+        self.assertEqual(sorted(order), sorted([a.id, b.id, c.id, longer.id]))
+        for task in (b, c, longer):
+            self.assertLess(order.index(task.depends_on_id), order.index(task.id))
+
+    def test_graph_endpoints_require_project_access(self):
+        outsider = make_user("outsider")
+        response = self.client.get(
+            reverse("tasks:critical_path", args=[self.project.id]),
+            **self.auth(outsider),
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class StatsTests(TaskApiTestCase):
+    def test_project_stats_in_constant_queries(self):
+        tasks = self.make_tasks(4)
+        Task.objects.filter(id=tasks[0].id).update(
+            status="completed", estimated_hours=2, actual_hours=3
+        )
+        Task.objects.filter(id=tasks[1].id).update(
+            priority="high",
+            estimated_hours="1.5",
+            due_date=timezone.now() - timedelta(days=1),
+        )
+        url = reverse("tasks:project_stats", args=[self.project.id])
+        self.client.get(url, **self.auth())
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, **self.auth())
+        stats = response.json()["stats"]
+        self.assertEqual(stats["total"], 4)
+        self.assertEqual(stats["by_status"]["completed"], 1)
+        self.assertEqual(stats["by_status"]["todo"], 3)
+        self.assertEqual(stats["by_priority"]["high"], 1)
+        self.assertEqual(stats["estimated_hours"], 3.5)
+        self.assertEqual(stats["actual_hours"], 3.0)
+        self.assertEqual(stats["overdue"], 1)
+        self.assertEqual(
+            stats["assignees"],
+            [{"id": self.member.id, "email": self.member.email, "tasks": 4, "open": 3}],
+        )
+        # access check, task groups, assignee groups
+        self.assertEqual(len(ctx.captured_queries), 3)
+
+        self.make_tasks(20)
+        with CaptureQueriesContext(connection) as more:
+            self.client.get(url, **self.auth())
+        self.assertEqual(len(more.captured_queries), len(ctx.captured_queries))
+
+    def test_cross_project_stats_cover_visible_tasks(self):
+        self.make_tasks(2)
+        other = Project.objects.create(name="Hidden", owner=make_user("stranger"))
+        Task.objects.create(project=other, title="Secret", created_by=other.owner)
+        response = self.client.get(reverse("tasks:my_stats"), **self.auth())
+        self.assertEqual(response.json()["stats"]["total"], 2)
+
+
+class CounterTests(TaskApiTestCase):
+    def refreshed(self, task):
+        task.refresh_from_db()
+        return task
+
+    def test_child_rows_keep_task_counters_current(self):
+        task = self.make_tasks(1)[0]
+        self.assertEqual(self.refreshed(task).assignee_count, 1)
+
+        comment = Comment.objects.create(task=task, author=self.member, content="Hi")
+        Comment.objects.create(task=task, author=self.owner, content="Hello")
+        comment.delete()
+        self.assertEqual(self.refreshed(task).comment_count, 1)
+
+        other = make_user("other")
+        self.client.put(
+            reverse("tasks:task_assignees", args=[task.id]),
+            data={"assignees": [other.id]},
+            content_type="application/json",
+            **self.auth(),
+        )
+        self.assertEqual(self.refreshed(task).assignee_count, 1)
+
+    def test_saving_stale_instances_keeps_concurrent_counts(self):
+        (task,) = self.make_tasks(1)
+        stale_task = Task.objects.get(id=task.id)
+        stale_project = Project.objects.get(id=self.project.id)
+        Comment.objects.create(task=task, author=self.member, content="Hi")
+        Task.objects.create(project=self.project, title="New", created_by=self.owner)
+
+        stale_task.title = "Renamed"
+        stale_task.save()
+        stale_project.name = "Renamed"
+        stale_project.save()
+        self.assertEqual(self.refreshed(task).comment_count, 1)
+        self.assertEqual(Project.objects.get(id=self.project.id).todo_task_count, 2)
+
+    def test_racing_status_changes_are_counted_once_each(self):
+        (task,) = self.make_tasks(1)
+        first, second = Task.objects.get(id=task.id), Task.objects.get(id=task.id)
+        first.status = "review"
+        first.save()
+        second.status = "completed"
+        second.save()
+        counts = Project.objects.values(
+            "todo_task_count", "review_task_count", "completed_task_count"
+        ).get(id=self.project.id)
+        self.assertEqual(
+            counts,
+            {"todo_task_count": 0, "review_task_count": 0, "completed_task_count": 1},
+        )
+
+    def test_status_changes_move_project_counts(self):
+        tasks = self.make_tasks(3)
+        tasks[0].status = "completed"
+        tasks[0].save()
+        self.client.patch(
+            reverse("tasks:bulk_tasks"),
+            data={"ids": [tasks[1].id], "changes": {"status": "review"}},
+            content_type="application/json",
+            **self.auth(),
+        )
+        self.client.post(
+            reverse("tasks:bulk_tasks"),
+            data={"tasks": [{"project_id": self.project.id, "title": "Bulk"}]},
+            content_type="application/json",
+            **self.auth(),
+        )
+        tasks[2].delete()
+
+        response = self.client.get(reverse("projects:list_projects"), **self.auth())
+        self.assertEqual(
+            response.json()["projects"][0]["task_counts"],
+            {"todo": 1, "in_progress": 0, "review": 1, "completed": 1, "archived": 0},
+        )
+
+    def test_counters_are_listed_and_repairable(self):
+        task = self.make_tasks(1)[0]
+        Comment.objects.create(task=task, author=self.member, content="Hi")
+        Task.objects.filter(id=task.id).update(comment_count=7, assignee_count=0)
+        Project.objects.filter(id=self.project.id).update(todo_task_count=0)
+
+        out = StringIO()
+        call_command("repair_counters", "--batch-size", "1", stdout=out)
+        self.assertIn("1 task(s) and 1 project(s) repaired", out.getvalue())
+
+        response = self.client.get(
+            reverse("tasks:list_tasks"),
+            {"fields": "id,comment_count,assignee_count,attachment_count"},
+            **self.auth(),
+        )
+        self.assertEqual(
+            response.json()["tasks"],
+            [
+                {
+                    "id": task.id,
+                    "comment_count": 1,
+                    "assignee_count": 1,
+                    "attachment_count": 0,
+                }
+            ],
+        )
+        self.assertEqual(Project.objects.get(id=self.project.id).todo_task_count, 1)
+
+
+class AttachmentTestCase(TaskApiTestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = media.name
+        settings = override_settings(
+            MEDIA_ROOT=self.media_root,
+            FILE_UPLOAD_TEMP_DIR=os.path.join(self.media_root, "tmp"),
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        os.mkdir(os.path.join(self.media_root, "tmp"))
+
+    def upload(self, task, content, name="design.psd"):
+        response = self.client.post(
+            reverse("tasks:upload_attachment", args=[task.id]),
+            {"file": SimpleUploadedFile(name, content)},
+            **self.auth(),
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()["attachment"]
+
+    def stored_files(self):
+        return [
+            name
+            for _, _, names in os.walk(os.path.join(self.media_root, "blobs"))
+            for name in names
+        ]
+
+
+class AttachmentStorageTests(AttachmentTestCase):
+    def test_identical_uploads_share_one_blob(self):
+        first, second = self.make_tasks(2)
+        content = b"layers" * 10000
+        a = self.upload(first, content)
+        b = self.upload(second, content, name="copy.psd")
+
+        blob = AttachmentBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(blob.size, len(content))
+        self.assertEqual((a["sha256"], b["sha256"]), (blob.sha256, blob.sha256))
+        self.assertEqual(b["filename"], "copy.psd")
+        self.assertEqual(self.stored_files(), [blob.sha256])
+        with open(os.path.join(self.media_root, blob.file.name), "rb") as f:
+            self.assertEqual(f.read(), content)
+
+        with mock.patch("django.core.files.move.os.rename", wraps=os.rename) as rename:
+            self.upload(first, b"something else")
+        self.assertEqual(AttachmentBlob.objects.count(), 2)
+        # The temporary upload sits next to MEDIA_ROOT, so it is renamed
+        # into place rather than copied.
+        rename.assert_called_once()
+        self.assertEqual(os.listdir(os.path.join(self.media_root, "tmp")), [])
+
+    def test_blob_is_removed_with_its_last_attachment(self):
+        (task,) = self.make_tasks(1)
+        self.upload(task, b"report")
+        self.upload(task, b"report")
+        first, second = TaskAttachment.objects.order_by("id")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(AttachmentBlob.objects.get().ref_count, 1)
+        self.assertEqual(len(self.stored_files()), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.delete()
+        self.assertFalse(AttachmentBlob.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+
+class AttachmentDownloadTests(AttachmentTestCase):
+    content = bytes(range(256)) * 40
+
+    def setUp(self):
+        super().setUp()
+        (self.task,) = self.make_tasks(1)
+        attachment = self.upload(self.task, self.content, name="data.bin")
+        self.url = reverse(
+            "tasks:download_attachment", args=[self.task.id, attachment["id"]]
+        )
+
+    def download(self, user=None, **headers):
+        response = self.client.get(self.url, **headers, **self.auth(user))
+        self.addCleanup(response.close)
+        return response
+
+    def test_whole_file_and_etag(self):
+        response = self.download()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.content)
+        self.assertEqual(response["Content-Length"], str(len(self.content)))
+        self.assertIn('filename="data.bin"', response["Content-Disposition"])
+
+        cached = self.download(HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(self.download(user=make_user("outsider")).status_code, 403)
+
+    def test_ranges(self):
+        size = len(self.content)
+        for header, start, end in (
+            ("bytes=10-19", 10, 19),
+            ("bytes=9000-", 9000, size - 1),
+            ("bytes=-5", size - 5, size - 1),
+            ("bytes=100-999999", 100, size - 1),
+        ):
+            response = self.download(HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 206, header)
+            body = b"".join(response.streaming_content)
+            self.assertEqual(body, self.content[start : end + 1], header)
+            self.assertEqual(response["Content-Length"], str(end - start + 1))
+            self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/{size}")
+
+        self.assertEqual(self.download(HTTP_RANGE=f"bytes={size}-").status_code, 416)
+        self.assertEqual(self.download(HTTP_RANGE="bytes=0-1,5-6").status_code, 200)
+        stale = self.download(HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(stale.status_code, 200)
+
+    def test_offload_to_front_end_server(self):
+        blob = AttachmentBlob.objects.get()
+        with self.settings(ATTACHMENT_OFFLOAD="x-accel-redirect"):
+            response = self.download()
+        self.assertEqual(response.content, b"")
+        self.assertEqual(
+            response["X-Accel-Redirect"], f"/protected-media/{blob.file.name}"
+        )
+        with self.settings(ATTACHMENT_OFFLOAD="x-sendfile"):
+            response = self.download()
+        self.assertEqual(
+            response["X-Sendfile"], os.path.join(self.media_root, blob.file.name)
+        )
+
+
+class AttachmentProcessingTests(AttachmentTestCase):
+    def png(self):
+        from PIL import Image
+
+        image = io.BytesIO()
+        Image.new("RGB", (640, 480), "red").save(image, "PNG")
+        return image.getvalue()
+
+    def process(self):
+        out = StringIO()
+        call_command("process_attachments", "--once", "--workers", "1", stdout=out)
+        return out.getvalue()
+
+    def test_worker_derives_metadata_thumbnails_and_text(self):
+        first, second = self.make_tasks(2)
+        self.upload(first, self.png(), name="mockup.png")
+        self.upload(first, b"%PDF-1.4 /Type /Pages /Type /Page /Type/Page", "a.pdf")
+        self.upload(first, b"Quarterly zanzibar figures", name="notes.txt")
+        self.upload(second, self.png(), name="again.png")
+        self.assertEqual(self.process(), "4 attachment(s) processed, 0 failed.\n")
+
+        image, pdf, text, duplicate = TaskAttachment.objects.order_by("id")
+        self.assertEqual(
+            image.metadata, {"mime_type": "image/png", "width": 640, "height": 480}
+        )
+        self.assertTrue(os.path.exists(image.thumbnail.path))
+        self.assertEqual(pdf.metadata["page_count"], 2)
+        self.assertEqual(text.extracted_text, "Quarterly zanzibar figures")
+        self.assertEqual(
+            {a.processing_state for a in (image, pdf, text, duplicate)}, {"done"}
+        )
+        self.assertEqual(duplicate.thumbnail.name, image.thumbnail.name)
+
+        response = self.client.get(
+            reverse("tasks:search_tasks"), {"q": "zanzibar"}, **self.auth()
+        )
+        self.assertEqual([r["id"] for r in response.json()["results"]], [first.id])
+        self.assertEqual(self.process(), "0 attachment(s) processed, 0 failed.\n")
+
+    def test_failures_and_abandoned_claims(self):
+        (task,) = self.make_tasks(1)
+        self.upload(task, b"gone")
+        attachment = TaskAttachment.objects.get()
+        os.remove(attachment.file.path)
+        self.assertIn("0 attachment(s) processed, 1 failed.", self.process())
+        attachment.refresh_from_db()
+        self.assertEqual(attachment.processing_state, "failed")
+        self.assertIn("FileNotFoundError", attachment.processing_error)
+
+        TaskAttachment.objects.update(
+            processing_state="processing",
+            processing_started_at=timezone.now() - STALE_AFTER / 2,
+        )
+        self.assertEqual(claim(10), [])
+        TaskAttachment.objects.update(
+            processing_started_at=timezone.now() - STALE_AFTER * 2
+        )
+        (claimed,) = claim(10)
+        self.assertEqual(claimed.processing_attempts, 2)
+        self.assertEqual(claim(10), [])
+
+        TaskAttachment.objects.update(
+            processing_started_at=timezone.now() - STALE_AFTER * 2,
+            processing_attempts=MAX_ATTEMPTS,
+        )
+        self.assertEqual(claim(10), [])
+        attachment.refresh_from_db()
+        self.assertEqual(attachment.processing_state, "failed")
+        self.assertEqual(attachment.processing_error, "Worker abandoned the job")
+
+    def test_broken_pool_releases_claims_instead_of_failing_them(self):
+        class CrashedPool:
+            def submit(self, fn, *args):
+                future = Future()
+                future.set_exception(BrokenProcessPool("worker died"))
+                return future
+
+        (task,) = self.make_tasks(1)
+        self.upload(task, b"first", name="a.txt")
+        self.upload(task, b"second", name="b.txt")
+        with self.assertRaises(BrokenProcessPool):
+            process_batch(CrashedPool(), 10)
+        self.assertEqual(
+            set(TaskAttachment.objects.values_list("processing_state", flat=True)),
+            {"pending"},
+        )
+
+        TaskAttachment.objects.update(processing_attempts=MAX_ATTEMPTS - 1)
+        with self.assertRaises(BrokenProcessPool):
+            process_batch(CrashedPool(), 10)
+        self.assertEqual(
+            set(TaskAttachment.objects.values_list("processing_error", flat=True)),
+            {"Worker abandoned the job"},
+        )
+        self.assertIn("0 attachment(s) processed, 0 failed.", self.process())
@@ -7,7 +7,19 @@ app_name = "tasks"
 urlpatterns = [
     path("tasks/", views.list_tasks, name="list_tasks"),
     path("tasks/create/", views.create_task, name="create_task"),
+    path("tasks/bulk/", views.bulk_tasks, name="bulk_tasks"),
+    path("tasks/search/", views.search_tasks, name="search_tasks"),
     path("tasks/<int:task_id>/", views.update_task, name="update_task"),
+    path(
+        "tasks/<int:task_id>/assignees/",
+        views.task_assignees,
+        name="task_assignees",
+    ),
+    path(
+        "tasks/<int:task_id>/dependencies/",
+        views.task_dependencies,
+        name="task_dependencies",
+    ),
     path("tasks/<int:task_id>/delete/", views.delete_task, name="delete_task"),
     path("comments/create/", views.create_comment, name="create_comment"),
     path("tasks/<int:task_id>/comments/", views.list_comments, name="list_comments"),
@@ -21,6 +33,28 @@ urlpatterns = [
         views.list_attachments,
         name="list_attachments",
     ),
+    path(
+        "tasks/<int:task_id>/attachments/<int:attachment_id>/download/",
+        views.download_attachment,
+        name="download_attachment",
+    ),
     path("categories/create/", views.create_category, name="create_category"),
     path("categories/", views.list_categories, name="list_categories"),
+    path("tags/", views.tag_cloud, name="tag_cloud"),
+    path("stats/", views.my_stats, name="my_stats"),
+    path(
+        "projects/<int:project_id>/critical-path/",
+        views.critical_path,
+        name="critical_path",
+    ),
+    path(
+        "projects/<int:project_id>/task-order/",
+        views.task_order,
+        name="task_order",
+    ),
+    path(
+        "projects/<int:project_id>/stats/",
+        views.project_stats,
+        name="project_stats",
+    ),
 ]
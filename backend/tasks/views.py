@@ -1,14 +1,68 @@
-import json
 import logging
-from datetime import datetime
 
-from django.http import JsonResponse
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Count, Max, Sum
 from django.views.decorators.csrf import csrf_exempt
 from projects.models import Project
-from users.models import CustomUser
-from users.utils import token_required
-
-from .models import Category, Comment, Task, TaskAssignment, TaskAttachment
+from projects.permissions import (
+    acan_access_task,
+    can_access_project,
+    can_access_task,
+    project_access_required,
+)
+from users.responses import JsonResponse
+from users.utils import conditional, parse_fields, token_required
+from users.validation import SchemaError
+
+from .models import Category, Comment, Task, TaskAttachment, TaskTag
+from .assignments import add_assignees, remove_assignees, replace_assignees
+from .blobs import HashingUploadHandler, store_blob
+from .bulk import bulk_create_tasks, bulk_update_tasks
+from .dependencies import (
+    DependencyCycleError,
+    check_dependency,
+    downstream,
+    project_graph,
+    schedule,
+    upstream,
+)
+from .downloads import attachment_response
+from .pagination import (
+    PaginationError,
+    akeyset_paginate,
+    cursor_for,
+    keyset_order,
+    parse_limit,
+)
+from .projections import (
+    COMMENT_SORT_FIELDS,
+    TASK_FIELDS,
+    TASK_SORT_FIELDS,
+    comment_queryset,
+    filter_tasks,
+    get_serialized_task,
+    serialize_attachment,
+    serialize_comment,
+    serialize_task,
+    task_queryset,
+    task_serializer,
+    visible_tasks,
+)
+from .schemas import (
+    ASSIGNEES,
+    BULK_CREATE,
+    BULK_UPDATE,
+    CATEGORY_CREATE,
+    COMMENT_CREATE,
+    TASK_CREATE,
+    TASK_UPDATE,
+)
+from .search import match_tasks, search_available
+from .stats import task_stats
+from .streaming import streaming_response, wants_stream
+from .tags import set_task_tags
 
 logger = logging.getLogger(__name__)
 
@@ -18,49 +72,23 @@ logger = logging.getLogger(__name__)
 def create_task(request):
     if request.method == "POST":
         try:
-            data = json.loads(request.body.decode("utf-8"))
-            project_id = data.get("project_id")
-            title = data.get("title")
-            description = data.get("description", "")
-            priority = data.get("priority", "medium")
-            status = data.get("status", "todo")
-            category_id = data.get("category_id")
-            due_date = data.get("due_date")
-            is_milestone = data.get("is_milestone", False)
-            depends_on_id = data.get("depends_on_id")
-            tags = data.get("tags", "")
-            estimated_hours = data.get("estimated_hours")
-            assignee_ids = data.get("assignees", [])
-
-            if not all([project_id, title]):
-                return JsonResponse(
-                    {"error": "Project ID and title are required"}, status=400
-                )
+            data = TASK_CREATE.decode(request.body)
+            project_id = data.pop("project_id")
+            category_id = data.pop("category_id", None)
+            depends_on_id = data.pop("depends_on_id", None)
+            tags = data.pop("tags")
+            assignee_ids = data.pop("assignees")
 
             try:
                 project = Project.objects.get(id=project_id)
-                if (
-                    request.user not in project.members.all()
-                    and request.user != project.owner
-                ):
+                if not can_access_project(request, project.id):
                     return JsonResponse(
                         {"error": "Not authorized for this project"}, status=403
                     )
             except Project.DoesNotExist:
                 return JsonResponse({"error": "Project not found"}, status=404)
 
-            task = Task(
-                project=project,
-                title=title,
-                description=description,
-                created_by=request.user,
-                priority=priority,
-                status=status,
-                is_milestone=is_milestone,
-                tags=tags,
-                estimated_hours=estimated_hours,
-                due_date=datetime.fromisoformat(due_date) if due_date else None,
-            )
+            task = Task(project=project, created_by=request.user, **data)
             if category_id:
                 try:
                     task.category = Category.objects.get(id=category_id)
@@ -76,121 +104,121 @@ def create_task(request):
                         {"error": "Dependent task not found"}, status=404
                     )
 
-            task.save()
-
-            for assignee_id in assignee_ids:
-                try:
-                    user = CustomUser.objects.get(id=assignee_id)
-                    TaskAssignment.objects.create(task=task, user=user)
-                except CustomUser.DoesNotExist:
-                    pass
+            with transaction.atomic():
+                task.save()
+                set_task_tags(task.id, tags)
+                add_assignees(task.id, assignee_ids)
 
             return JsonResponse(
                 {
                     "message": "Request processed successfully",
-                    "task": {
-                        "id": task.id,
-                        "title": task.title,
-                        "description": task.description,
-                        "priority": task.priority,
-                        "status": task.status,
-                        "category": task.category.name if task.category else None,
-                        "due_date": (
-                            task.due_date.isoformat() if task.due_date else None
-                        ),
-                        "is_milestone": task.is_milestone,
-                        "depends_on": task.depends_on.id if task.depends_on else None,
-                        "tags": task.tags,
-                        "estimated_hours": (
-                            float(task.estimated_hours)
-                            if task.estimated_hours
-                            else None
-                        ),
-                        "project": task.project.id,
-                        "created_by": {
-                            "id": task.created_by.id,
-                            "email": task.created_by.email,
-                        },
-                        "assignees": [
-                            {"id": a.user.id, "email": a.user.email, "status": a.status}
-                            for a in task.assignments.all()
-                        ],
-                    },
+                    "task": get_serialized_task(task.id),
                 },
                 status=201,
             )
-        except json.JSONDecodeError:
-            return JsonResponse({"error": "Invalid JSON format"}, status=400)
+        except SchemaError as e:
+            return JsonResponse({"error": str(e)}, status=400)
         except Exception as e:
             logger.error(f"Create task error: {str(e)}")
             return JsonResponse({"error": str(e)}, status=500)
     return JsonResponse({"error": "Method not allowed"}, status=405)
 
 
+@csrf_exempt
 @token_required
-def list_tasks(request):
-    if request.method == "GET":
+def bulk_tasks(request):
+    if request.method == "POST":
         try:
-            tasks = (
-                Task.objects.filter(project__owner=request.user)
-                | Task.objects.filter(project__members=request.user)
-                | Task.objects.filter(assignments__user=request.user)
+            items = BULK_CREATE.decode(request.body)["tasks"]
+            created_ids, errors = bulk_create_tasks(request.user, items)
+            tasks = task_queryset(Task.objects.filter(id__in=created_ids)).in_bulk()
+            return JsonResponse(
+                {
+                    "message": "Request processed successfully",
+                    "tasks": [
+                        serialize_task(tasks[task_id]) for task_id in created_ids
+                    ],
+                    "errors": errors,
+                },
+                status=201 if created_ids else 400,
             )
-            tasks = tasks.distinct()
+        except SchemaError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        except Exception as e:
+            logger.error(f"Bulk create tasks error: {str(e)}")
+            return JsonResponse({"error": str(e)}, status=500)
+    elif request.method == "PATCH":
+        try:
+            data = BULK_UPDATE.decode(request.body)
+            try:
+                updated = bulk_update_tasks(
+                    request.user,
+                    data["changes"],
+                    ids=data.get("ids"),
+                    filters=data.get("filter"),
+                )
+            except ValidationError as e:
+                return JsonResponse({"error": "; ".join(e.messages)}, status=400)
 
-            status_filter = request.GET.get("status")
-            priority_filter = request.GET.get("priority")
-            category_id = request.GET.get("category_id")
-            project_id = request.GET.get("project_id")
+            return JsonResponse(
+                {"message": "Request processed successfully", "updated": updated},
+                status=200,
+            )
+        except SchemaError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        except Exception as e:
+            logger.error(f"Bulk update tasks error: {str(e)}")
+            return JsonResponse({"error": str(e)}, status=500)
+    return JsonResponse({"error": "Method not allowed"}, status=405)
+
+
+async def task_list_state(request):
+    state = await filter_tasks(visible_tasks(request.user), request.GET).aaggregate(
+        count=Count("id"), id_sum=Sum("id"), last_modified=Max("updated_at")
+    )
+    return (request.user.id, *state.values()), state["last_modified"]
+
+
+@token_required
+@conditional(task_list_state)
+async def list_tasks(request):
+    if request.method == "GET":
+        try:
+            tasks = filter_tasks(visible_tasks(request.user), request.GET)
             sort = request.GET.get("sort", "-created_at")
 
-            if status_filter:
-                tasks = tasks.filter(status=status_filter)
-            if priority_filter:
-                tasks = tasks.filter(priority=priority_filter)
-            if category_id:
-                tasks = tasks.filter(category_id=category_id)
-            if project_id:
-                tasks = tasks.filter(project_id=project_id)
-            tasks = tasks.order_by(sort)
+            try:
+                fields = parse_fields(request.GET.get("fields"), TASK_FIELDS)
+            except ValueError as e:
+                return JsonResponse({"error": str(e)}, status=400)
+            serialize = task_serializer(fields)
+            tasks = task_queryset(tasks, fields)
+
+            try:
+                mode = wants_stream(request)
+                if mode:
+                    return streaming_response(
+                        keyset_order(tasks, sort, TASK_SORT_FIELDS),
+                        serialize,
+                        "tasks",
+                        mode,
+                        asynchronous=isinstance(request, ASGIRequest),
+                    )
+                tasks, next_cursor = await akeyset_paginate(
+                    tasks,
+                    sort,
+                    TASK_SORT_FIELDS,
+                    cursor=request.GET.get("cursor"),
+                    limit=parse_limit(request.GET.get("limit")),
+                )
+            except PaginationError as e:
+                return JsonResponse({"error": str(e)}, status=400)
 
             return JsonResponse(
                 {
                     "message": "Request processed successfully",
-                    "tasks": [
-                        {
-                            "id": t.id,
-                            "title": t.title,
-                            "description": t.description,
-                            "priority": t.priority,
-                            "status": t.status,
-                            "category": t.category.name if t.category else None,
-                            "due_date": t.due_date.isoformat() if t.due_date else None,
-                            "is_milestone": t.is_milestone,
-                            "depends_on": t.depends_on.id if t.depends_on else None,
-                            "tags": t.tags,
-                            "estimated_hours": (
-                                float(t.estimated_hours) if t.estimated_hours else None
-                            ),
-                            "actual_hours": (
-                                float(t.actual_hours) if t.actual_hours else None
-                            ),
-                            "project": t.project.id,
-                            "created_by": {
-                                "id": t.created_by.id,
-                                "email": t.created_by.email,
-                            },
-                            "assignees": [
-                                {
-                                    "id": a.user.id,
-                                    "email": a.user.email,
-                                    "status": a.status,
-                                }
-                                for a in t.assignments.all()
-                            ],
-                        }
-                        for t in tasks
-                    ],
+                    "tasks": [serialize(t) for t in tasks],
+                    "next_cursor": next_cursor,
                 },
                 status=200,
             )
@@ -200,91 +228,129 @@ def list_tasks(request):
     return JsonResponse({"error": "Method not allowed"}, status=405)
 
 
+@token_required
+def search_tasks(request):
+    if request.method == "GET":
+        try:
+            query = request.GET.get("q", "").strip()
+            if not query:
+                return JsonResponse({"error": "Search query is required"}, status=400)
+            if not search_available():
+                return JsonResponse(
+                    {"error": "Search is not available on this database"}, status=501
+                )
+            try:
+                fields = parse_fields(request.GET.get("fields"), TASK_FIELDS)
+                limit = parse_limit(request.GET.get("limit"), default=20, maximum=100)
+            except ValueError as e:
+                return JsonResponse({"error": str(e)}, status=400)
+
+            matches = match_tasks(request.user, query, request.GET, limit)
+            tasks = task_queryset(
+                Task.objects.filter(id__in=[task_id for task_id, _, _ in matches]),
+                fields,
+            ).in_bulk()
+            serialize = task_serializer(fields)
+
+            return JsonResponse(
+                {
+                    "message": "Request processed successfully",
+                    "results": [
+                        {**serialize(tasks[task_id]), "rank": rank, "snippet": snippet}
+                        for task_id, rank, snippet in matches
+                        if task_id in tasks
+                    ],
+                },
+                status=200,
+            )
+        except Exception as e:
+            logger.error(f"Search tasks error: {str(e)}")
+            return JsonResponse({"error": str(e)}, status=500)
+    return JsonResponse({"error": "Method not allowed"}, status=405)
+
+
 @csrf_exempt
 @token_required
 def update_task(request, task_id):
     if request.method == "PUT":
         try:
+            data = TASK_UPDATE.decode(request.body)
             task = Task.objects.get(id=task_id, project__owner=request.user)
-            data = json.loads(request.body.decode("utf-8"))
-
-            task.title = data.get("title", task.title)
-            task.description = data.get("description", task.description)
-            task.priority = data.get("priority", task.priority)
-            task.status = data.get("status", task.status)
-            task.is_milestone = data.get("is_milestone", task.is_milestone)
-            task.tags = data.get("tags", task.tags)
-            task.estimated_hours = data.get("estimated_hours", task.estimated_hours)
-            task.actual_hours = data.get("actual_hours", task.actual_hours)
-            task.due_date = (
-                datetime.fromisoformat(data["due_date"])
-                if data.get("due_date")
-                else task.due_date
-            )
 
-            category_id = data.get("category_id")
+            category_id = data.pop("category_id", None)
             if category_id:
                 try:
                     task.category = Category.objects.get(id=category_id)
                 except Category.DoesNotExist:
                     return JsonResponse({"error": "Category not found"}, status=404)
 
-            depends_on_id = data.get("depends_on_id")
-            if depends_on_id:
-                try:
-                    task.depends_on = Task.objects.get(
-                        id=depends_on_id, project=task.project
-                    )
-                except Task.DoesNotExist:
-                    return JsonResponse(
-                        {"error": "Dependent task not found"}, status=404
-                    )
+            depends_on_id = data.pop("depends_on_id", None)
+            tags = data.pop("tags", None)
+            assignee_ids = data.pop("assignees", None)
+            for name, value in data.items():
+                setattr(task, name, value)
+            with transaction.atomic():
+                if depends_on_id:
+                    # Checked under the same locks as the save, so racing
+                    # updates cannot both pass and commit a cycle.
+                    try:
+                        task.depends_on = Task.objects.get(
+                            id=depends_on_id, project=task.project
+                        )
+                        check_dependency(task.id, depends_on_id)
+                    except Task.DoesNotExist:
+                        return JsonResponse(
+                            {"error": "Dependent task not found"}, status=404
+                        )
+                    except DependencyCycleError as e:
+                        return JsonResponse({"error": str(e)}, status=400)
+                task.save()
+                if tags is not None:
+                    set_task_tags(task.id, tags)
+                if assignee_ids is not None:
+                    replace_assignees(task.id, assignee_ids)
 
-            task.save()
+            return JsonResponse(
+                {
+                    "message": "Request processed successfully",
+                    "task": get_serialized_task(task.id),
+                },
+                status=200,
+            )
+        except Task.DoesNotExist:
+            return JsonResponse(
+                {"error": "Task not found or not authorized"}, status=404
+            )
+        except SchemaError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        except Exception as e:
+            logger.error(f"Update task error: {str(e)}")
+            return JsonResponse({"error": str(e)}, status=500)
+    return JsonResponse({"error": "Method not allowed"}, status=405)
+
+
+ASSIGNEE_OPERATIONS = {
+    "POST": add_assignees,
+    "DELETE": remove_assignees,
+    "PUT": replace_assignees,
+}
 
-            assignee_ids = data.get("assignees", [])
-            task.assignments.all().delete()
-            for assignee_id in assignee_ids:
-                try:
-                    user = CustomUser.objects.get(id=assignee_id)
-                    TaskAssignment.objects.create(task=task, user=user)
-                except CustomUser.DoesNotExist:
-                    pass
 
+@csrf_exempt
+@token_required
+def task_assignees(request, task_id):
+    operation = ASSIGNEE_OPERATIONS.get(request.method)
+    if operation:
+        try:
+            data = ASSIGNEES.decode(request.body)
+            task = Task.objects.get(id=task_id, project__owner=request.user)
+            added, removed = operation(task.id, data["assignees"])
             return JsonResponse(
                 {
                     "message": "Request processed successfully",
-                    "task": {
-                        "id": task.id,
-                        "title": task.title,
-                        "description": task.description,
-                        "priority": task.priority,
-                        "status": task.status,
-                        "category": task.category.name if task.category else None,
-                        "due_date": (
-                            task.due_date.isoformat() if task.due_date else None
-                        ),
-                        "is_milestone": task.is_milestone,
-                        "depends_on": task.depends_on.id if task.depends_on else None,
-                        "tags": task.tags,
-                        "estimated_hours": (
-                            float(task.estimated_hours)
-                            if task.estimated_hours
-                            else None
-                        ),
-                        "actual_hours": (
-                            float(task.actual_hours) if task.actual_hours else None
-                        ),
-                        "project": task.project.id,
-                        "created_by": {
-                            "id": task.created_by.id,
-                            "email": task.created_by.email,
-                        },
-                        "assignees": [
-                            {"id": a.user.id, "email": a.user.email, "status": a.status}
-                            for a in task.assignments.all()
-                        ],
-                    },
+                    "added": added,
+                    "removed": removed,
+                    "task": get_serialized_task(task.id),
                 },
                 status=200,
             )
@@ -292,10 +358,10 @@ def update_task(request, task_id):
             return JsonResponse(
                 {"error": "Task not found or not authorized"}, status=404
             )
-        except json.JSONDecodeError:
-            return JsonResponse({"error": "Invalid JSON format"}, status=400)
+        except SchemaError as e:
+            return JsonResponse({"error": str(e)}, status=400)
         except Exception as e:
-            logger.error(f"Update task error: {str(e)}")
+            logger.error(f"Task assignees error: {str(e)}")
             return JsonResponse({"error": str(e)}, status=500)
     return JsonResponse({"error": "Method not allowed"}, status=405)
 
@@ -306,7 +372,8 @@ def delete_task(request, task_id):
     if request.method == "DELETE":
         try:
             task = Task.objects.get(id=task_id, project__owner=request.user)
-            task.delete()
+            with transaction.atomic():
+                task.delete()
             return JsonResponse(
                 {"message": "Request processed successfully, task deleted"},
                 status=200,
@@ -326,81 +393,88 @@ def delete_task(request, task_id):
 def create_comment(request):
     if request.method == "POST":
         try:
-            data = json.loads(request.body.decode("utf-8"))
-            task_id = data.get("task_id")
-            content = data.get("content")
-
-            if not all([task_id, content]):
-                return JsonResponse(
-                    {"error": "Task ID and content are required"}, status=400
-                )
+            data = COMMENT_CREATE.decode(request.body)
 
             try:
-                task = Task.objects.get(id=task_id)
-                if (
-                    request.user not in task.project.members.all()
-                    and request.user != task.project.owner
-                ):
+                task = Task.objects.get(id=data["task_id"])
+                if not can_access_task(request, task):
                     return JsonResponse(
                         {"error": "Not authorized for this task"}, status=403
                     )
             except Task.DoesNotExist:
                 return JsonResponse({"error": "Task not found"}, status=404)
 
-            comment = Comment(task=task, author=request.user, content=content)
-            comment.save()
+            comment = Comment(task=task, author=request.user, content=data["content"])
+            with transaction.atomic():
+                comment.save()
 
             return JsonResponse(
                 {
                     "message": "Request processed successfully",
-                    "comment": {
-                        "id": comment.id,
-                        "task_id": comment.task.id,
-                        "author": {
-                            "id": comment.author.id,
-                            "email": comment.author.email,
-                        },
-                        "content": comment.content,
-                        "created_at": comment.created_at.isoformat(),
-                    },
+                    "comment": serialize_comment(comment),
                 },
                 status=201,
             )
-        except json.JSONDecodeError:
-            return JsonResponse({"error": "Invalid JSON format"}, status=400)
+        except SchemaError as e:
+            return JsonResponse({"error": str(e)}, status=400)
         except Exception as e:
             logger.error(f"Create comment error: {str(e)}")
             return JsonResponse({"error": str(e)}, status=500)
     return JsonResponse({"error": "Method not allowed"}, status=405)
 
 
+async def comment_list_state(request, task_id):
+    task = await Task.objects.filter(id=task_id).only("id", "project_id").afirst()
+    if task is None or not await acan_access_task(request, task):
+        return None
+    state = await Comment.objects.filter(task_id=task_id).aaggregate(
+        count=Count("id"), last_id=Max("id"), last_modified=Max("created_at")
+    )
+    return tuple(state.values()), state["last_modified"]
+
+
 @token_required
-def list_comments(request, task_id):
+@conditional(comment_list_state)
+async def list_comments(request, task_id):
     if request.method == "GET":
         try:
-            task = Task.objects.get(id=task_id)
-            if (
-                request.user not in task.project.members.all()
-                and request.user != task.project.owner
-            ):
+            task = await Task.objects.only("id", "project_id").aget(id=task_id)
+            if not await acan_access_task(request, task):
                 return JsonResponse(
                     {"error": "Not authorized for this task"}, status=403
                 )
 
-            comments = task.comments.all()
+            # ?since= is a cursor from an earlier poll_cursor: it lists what
+            # was posted after it, oldest first.
+            since = request.GET.get("since")
+            cursor = request.GET.get("cursor")
+            if since and cursor:
+                return JsonResponse(
+                    {"error": "Use either cursor or since, not both"}, status=400
+                )
+            sort = "created_at" if since else request.GET.get("sort", "-created_at")
+            try:
+                comments, next_cursor = await akeyset_paginate(
+                    comment_queryset(task.id),
+                    sort,
+                    COMMENT_SORT_FIELDS,
+                    cursor=since or cursor,
+                    limit=parse_limit(request.GET.get("limit")),
+                )
+            except PaginationError as e:
+                return JsonResponse({"error": str(e)}, status=400)
+
+            if comments:
+                newest = max(comments, key=lambda c: (c.created_at, c.id))
+                poll_cursor = cursor_for(newest, "created_at")
+            else:
+                poll_cursor = since
             return JsonResponse(
                 {
                     "message": "Request processed successfully",
-                    "comments": [
-                        {
-                            "id": c.id,
-                            "task_id": c.task.id,
-                            "author": {"id": c.author.id, "email": c.author.email},
-                            "content": c.content,
-                            "created_at": c.created_at.isoformat(),
-                        }
-                        for c in comments
-                    ],
+                    "comments": [serialize_comment(c) for c in comments],
+                    "next_cursor": next_cursor,
+                    "poll_cursor": poll_cursor,
                 },
                 status=200,
             )
@@ -416,12 +490,11 @@ def list_comments(request, task_id):
 @token_required
 def upload_attachment(request, task_id):
     if request.method == "POST":
+        # Must be set before request.FILES is first read.
+        request.upload_handlers = [HashingUploadHandler(request)]
         try:
             task = Task.objects.get(id=task_id)
-            if (
-                request.user not in task.project.members.all()
-                and request.user != task.project.owner
-            ):
+            if not can_access_task(request, task):
                 return JsonResponse(
                     {"error": "Not authorized for this task"}, status=403
                 )
@@ -430,30 +503,24 @@ def upload_attachment(request, task_id):
             if not file:
                 return JsonResponse({"error": "File is required"}, status=400)
 
-            attachment = TaskAttachment(
-                task=task,
-                file=file,
-                filename=file.name,
-                file_type=file.content_type,
-                uploaded_by=request.user,
-            )
-            attachment.save()
+            with transaction.atomic():
+                blob = store_blob(file)
+                attachment = TaskAttachment(
+                    task=task,
+                    file=blob.file.name,
+                    blob=blob,
+                    size=blob.size,
+                    sha256=blob.sha256,
+                    filename=file.name,
+                    file_type=file.content_type,
+                    uploaded_by=request.user,
+                )
+                attachment.save()
 
             return JsonResponse(
                 {
                     "message": "Request processed successfully",
-                    "attachment": {
-                        "id": attachment.id,
-                        "task_id": attachment.task.id,
-                        "filename": attachment.filename,
-                        "file_type": attachment.file_type,
-                        "file_url": attachment.file.url,
-                        "uploaded_by": {
-                            "id": attachment.uploaded_by.id,
-                            "email": attachment.uploaded_by.email,
-                        },
-                        "uploaded_at": attachment.uploaded_at.isoformat(),
-                    },
+                    "attachment": serialize_attachment(attachment),
                 },
                 status=201,
             )
@@ -466,37 +533,22 @@ def upload_attachment(request, task_id):
 
 
 @token_required
-def list_attachments(request, task_id):
+async def list_attachments(request, task_id):
     if request.method == "GET":
         try:
-            task = Task.objects.get(id=task_id)
-            if (
-                request.user not in task.project.members.all()
-                and request.user != task.project.owner
-            ):
+            task = await Task.objects.only("id", "project_id").aget(id=task_id)
+            if not await acan_access_task(request, task):
                 return JsonResponse(
                     {"error": "Not authorized for this task"}, status=403
                 )
 
-            attachments = task.attachments.all()
+            attachments = task.attachments.select_related("uploaded_by").defer(
+                "extracted_text"
+            )
             return JsonResponse(
                 {
                     "message": "Request processed successfully",
-                    "attachments": [
-                        {
-                            "id": a.id,
-                            "task_id": a.task.id,
-                            "filename": a.filename,
-                            "file_type": a.file_type,
-                            "file_url": a.file.url,
-                            "uploaded_by": {
-                                "id": a.uploaded_by.id,
-                                "email": a.uploaded_by.email,
-                            },
-                            "uploaded_at": a.uploaded_at.isoformat(),
-                        }
-                        for a in attachments
-                    ],
+                    "attachments": [serialize_attachment(a) async for a in attachments],
                 },
                 status=200,
             )
@@ -508,19 +560,34 @@ def list_attachments(request, task_id):
     return JsonResponse({"error": "Method not allowed"}, status=405)
 
 
+@token_required
+def download_attachment(request, task_id, attachment_id):
+    if request.method in ("GET", "HEAD"):
+        try:
+            attachment = TaskAttachment.objects.select_related("task").get(
+                id=attachment_id, task_id=task_id
+            )
+            if not can_access_task(request, attachment.task):
+                return JsonResponse(
+                    {"error": "Not authorized for this task"}, status=403
+                )
+            return attachment_response(request, attachment)
+        except TaskAttachment.DoesNotExist:
+            return JsonResponse({"error": "Attachment not found"}, status=404)
+        except FileNotFoundError:
+            return JsonResponse({"error": "Attachment file is missing"}, status=404)
+        except Exception as e:
+            logger.error(f"Download attachment error: {str(e)}")
+            return JsonResponse({"error": str(e)}, status=500)
+    return JsonResponse({"error": "Method not allowed"}, status=405)
+
+
 @csrf_exempt
 @token_required
 def create_category(request):
     if request.method == "POST":
         try:
-            data = json.loads(request.body.decode("utf-8"))
-            name = data.get("name")
-            description = data.get("description", "")
-
-            if not name:
-                return JsonResponse({"error": "Name is required"}, status=400)
-
-            category = Category(name=name, description=description)
+            category = Category(**CATEGORY_CREATE.decode(request.body))
             category.save()
 
             return JsonResponse(
@@ -534,8 +601,8 @@ def create_category(request):
                 },
                 status=201,
             )
-        except json.JSONDecodeError:
-            return JsonResponse({"error": "Invalid JSON format"}, status=400)
+        except SchemaError as e:
+            return JsonResponse({"error": str(e)}, status=400)
         except Exception as e:
             logger.error(f"Create category error: {str(e)}")
             return JsonResponse({"error": str(e)}, status=500)
@@ -561,3 +628,155 @@ def list_categories(request):
             logger.error(f"List categories error: {str(e)}")
             return JsonResponse({"error": str(e)}, status=500)
     return JsonResponse({"error": "Method not allowed"}, status=405)
+
+
+@token_required
+def tag_cloud(request):
+    if request.method == "GET":
+        try:
+            tasks = visible_tasks(request.user)
+            project_id = request.GET.get("project_id")
+            if project_id:
+                tasks = tasks.filter(project_id=project_id)
+
+            rows = (
+                TaskTag.objects.filter(task__in=tasks)
+                .values("tag__name", "task__project_id")
+                .annotate(count=Count("id"))
+                .order_by()
+            )
+            tags = {}
+            for row in rows:
+                tag = tags.setdefault(
+                    row["tag__name"],
+                    {"name": row["tag__name"], "count": 0, "projects": {}},
+                )
+                tag["count"] += row["count"]
+                tag["projects"][row["task__project_id"]] = row["count"]
+
+            return JsonResponse(
+                {
+                    "message": "Request processed successfully",
+                    "tags": sorted(
+                        tags.values(), key=lambda t: (-t["count"], t["name"])
+                    ),
+                },
+                status=200,
+            )
+        except Exception as e:
+            logger.error(f"Tag cloud error: {str(e)}")
+            return JsonResponse({"error": str(e)}, status=500)
+    return JsonResponse({"error": "Method not allowed"}, status=405)
+
+
+@token_required
+def task_dependencies(request, task_id):
+    if request.method == "GET":
+        try:
+            task = Task.objects.only("id", "project_id").get(id=task_id)
+            if not can_access_task(request, task):
+                return JsonResponse(
+                    {"error": "Not authorized for this task"}, status=403
+                )
+
+            return JsonResponse(
+                {
+                    "message": "Request processed successfully",
+                    "upstream": upstream(task.id),
+                    "downstream": [
+                        {"id": pk, "depends_on": parent}
+                        for pk, parent in downstream(task.id).items()
+                    ],
+                },
+                status=200,
+            )
+        except Task.DoesNotExist:
+            return JsonResponse({"error": "Task not found"}, status=404)
+        except Exception as e:
+            logger.error(f"Task dependencies error: {str(e)}")
+            return JsonResponse({"error": str(e)}, status=500)
+    return JsonResponse({"error": "Method not allowed"}, status=405)
+
+
+CRITICAL_PATH_FIELDS = ["id", "title", "status", "estimated_hours", "depends_on"]
+
+
+@token_required
+@project_access_required
+def critical_path(request, project_id):
+    if request.method == "GET":
+        try:
+            _, path, total_hours, cyclic_ids = schedule(project_graph(project_id))
+            tasks = task_queryset(
+                Task.objects.filter(id__in=path), CRITICAL_PATH_FIELDS
+            ).in_bulk()
+            serialize = task_serializer(CRITICAL_PATH_FIELDS)
+            return JsonResponse(
+                {
+                    "message": "Request processed successfully",
+                    "critical_path": [serialize(tasks[pk]) for pk in path],
+                    "total_hours": total_hours,
+                    "cyclic": cyclic_ids,
+                },
+                status=200,
+            )
+        except Exception as e:
+            logger.error(f"Critical path error: {str(e)}")
+            return JsonResponse({"error": str(e)}, status=500)
+    return JsonResponse({"error": "Method not allowed"}, status=405)
+
+
+@token_required
+@project_access_required
+def task_order(request, project_id):
+    if request.method == "GET":
+        try:
+            order, _, _, cyclic_ids = schedule(project_graph(project_id))
+            return JsonResponse(
+                {
+                    "message": "Request processed successfully",
+                    "order": order,
+                    "cyclic": cyclic_ids,
+                },
+                status=200,
+            )
+        except Exception as e:
+            logger.error(f"Task order error: {str(e)}")
+            return JsonResponse({"error": str(e)}, status=500)
+    return JsonResponse({"error": "Method not allowed"}, status=405)
+
+
+@token_required
+@project_access_required
+def project_stats(request, project_id):
+    if request.method == "GET":
+        try:
+            return JsonResponse(
+                {
+                    "message": "Request processed successfully",
+                    "stats": task_stats(Task.objects.filter(project_id=project_id)),
+                },
+                status=200,
+            )
+        except Exception as e:
+            logger.error(f"Project stats error: {str(e)}")
+            return JsonResponse({"error": str(e)}, status=500)
+    return JsonResponse({"error": "Method not allowed"}, status=405)
+
+
+@token_required
+def my_stats(request):
+    if request.method == "GET":
+        try:
+            tasks = filter_tasks(visible_tasks(request.user), request.GET)
+            return JsonResponse(
+                {
+                    "message": "Request processed successfully",
+                    "stats": task_stats(tasks),
+                },
+                status=200,
+            )
+        except Exception as e:
+            logger.error(f"Stats error: {str(e)}")
+            return JsonResponse({"error": str(e)}, status=500)
+    return JsonResponse({"error": "Method not allowed"}, status=405)
@@ -10,7 +10,6 @@ class CustomUserAdmin(admin.ModelAdmin):
             None,
             {"fields": ("username", "email", "first_name", "last_name", "password")},
         ),
-        ("Additional Info", {"fields": ("authToken",)}),
         ("Important Dates", {"fields": ("created_at",)}),
     )
 
@@ -27,7 +26,7 @@ class CustomUserAdmin(admin.ModelAdmin):
     ordering = ("email",)
 
     # Make certain fields read-only if needed
-    readonly_fields = ("authToken", "created_at")
+    readonly_fields = ("created_at",)
 
 
 # Unregister the model if already registered to avoid conflicts
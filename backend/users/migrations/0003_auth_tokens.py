@@ -0,0 +1,61 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:19
+
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def import_legacy_tokens(apps, schema_editor):
+    """Keep every user's current authToken valid as a session token."""
+    CustomUser = apps.get_model("users", "CustomUser")
+    AuthToken = apps.get_model("users", "AuthToken")
+    AuthToken.objects.bulk_create(
+        [
+            AuthToken(
+                user_id=user_id,
+                key_hash=hashlib.sha256(str(token).encode("ascii")).hexdigest(),
+            )
+            for user_id, token in CustomUser.objects.values_list("id", "authToken")
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_remove_customuser_bio_customuser_password_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuthToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "key_hash",
+                    models.CharField(editable=False, max_length=64, unique=True),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("expires_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="auth_tokens",
+                        to="users.customuser",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(import_legacy_tokens, migrations.RunPython.noop),
+    ]
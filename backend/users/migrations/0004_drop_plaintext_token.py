@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:07
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_auth_tokens"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="customuser",
+            name="authToken",
+        ),
+    ]
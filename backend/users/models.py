@@ -1,5 +1,3 @@
-import uuid
-
 from django.db import models
 
 
@@ -8,7 +6,6 @@ class CustomUser(models.Model):
     email = models.EmailField(unique=True)
     first_name = models.CharField(max_length=30)
     last_name = models.CharField(max_length=30)
-    authToken = models.UUIDField(default=uuid.uuid4, editable=False)
     password = models.CharField(max_length=128, editable=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -17,3 +14,22 @@ class CustomUser(models.Model):
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
+
+
+class AuthToken(models.Model):
+    """An API session token, stored as a SHA-256 digest of the bearer value.
+
+    A user may hold several tokens at once (one per session); each expires
+    independently. The bearer value itself is never stored: it is returned
+    once, by signup or login.
+    """
+
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, related_name="auth_tokens"
+    )
+    key_hash = models.CharField(max_length=64, unique=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Token for {self.user}"
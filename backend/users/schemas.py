@@ -0,0 +1,24 @@
+from .models import CustomUser
+from .validation import Schema, String, from_model
+
+REGISTER = Schema(
+    required_error="Missing required fields",
+    email=from_model(CustomUser, "email", required=True),
+    username=from_model(CustomUser, "username", required=True),
+    first_name=from_model(CustomUser, "first_name", required=True),
+    last_name=from_model(CustomUser, "last_name", required=True),
+    password=from_model(CustomUser, "password", required=True),
+)
+
+LOGIN = Schema(
+    required_error="Missing required fields",
+    email=String(required=True),
+    password=String(required=True),
+)
+
+PROFILE_UPDATE = Schema(
+    username=from_model(CustomUser, "username", blank=False),
+    first_name=from_model(CustomUser, "first_name", blank=False),
+    last_name=from_model(CustomUser, "last_name", blank=False),
+    password=from_model(CustomUser, "password", blank=False),
+)
@@ -1,3 +1,201 @@
+import json
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from . import responses
+from .schemas import REGISTER
+from .models import AuthToken, CustomUser
+from .tokens import hash_token, issue_token, revoke_token, token_cache
+from .utils import diff_user_ids
+from .validation import DateTime, Decimal as DecimalField, Schema, SchemaError
+
+
+def make_user(name):
+    user = CustomUser.objects.create(
+        username=name,
+        email=f"{name}@example.com",
+        first_name=name,
+        last_name="Test",
+        password="secret",
+    )
+    user.token = issue_token(user)
+    return user
+
+
+class TokenAuthTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = make_user("alice")
+
+    def get_profile(self, token):
+        return self.client.get(
+            reverse("users:profile"), HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+
+    def login(self):
+        return self.client.post(
+            reverse("users:login"),
+            data={"email": self.user.email, "password": "secret"},
+            content_type="application/json",
+        )
+
+    def test_signup_token_is_stored_hashed(self):
+        response = self.client.post(
+            reverse("users:register"),
+            data={
+                "username": "bob",
+                "email": "bob@example.com",
+                "first_name": "Bob",
+                "last_name": "Test",
+                "password": "secret",
+            },
+            content_type="application/json",
+        )
+        raw = response.json()["user"]["authToken"]
+        token = AuthToken.objects.get(user__username="bob")
+        self.assertEqual(token.key_hash, hash_token(raw))
+        self.assertNotIn(raw, str(CustomUser.objects.filter(username="bob").values()))
+        self.assertEqual(self.get_profile(raw).status_code, 200)
+
+    def test_cached_token_costs_no_queries(self):
+        self.assertEqual(self.get_profile(self.user.token).status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.get_profile(self.user.token)
+        self.assertEqual(response.json()["email"], self.user.email)
+
+    def test_login_opens_a_new_session_alongside_the_others(self):
+        old_token = self.user.token
+        self.assertEqual(self.get_profile(old_token).status_code, 200)
+
+        new_token = self.login().json()["user"]["authToken"]
+        self.assertEqual(self.get_profile(old_token).status_code, 200)
+        self.assertEqual(self.get_profile(new_token).status_code, 200)
+        self.assertNotIn("authToken", self.get_profile(new_token).json())
+
+        revoke_token(old_token)
+        self.assertEqual(self.get_profile(old_token).status_code, 401)
+        self.assertEqual(self.get_profile(new_token).status_code, 200)
+
+    def put_profile(self, **changes):
+        return self.client.put(
+            reverse("users:profile"),
+            data=changes,
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {self.user.token}",
+        )
+
+    def test_profile_updates_are_not_lost_to_the_cache(self):
+        self.assertEqual(self.get_profile(self.user.token).status_code, 200)
+        self.assertEqual(self.put_profile(first_name="Changed").status_code, 200)
+        profile = self.get_profile(self.user.token).json()
+        self.assertEqual(profile["first_name"], "Changed")
+
+        self.assertEqual(self.put_profile(last_name="New").status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(
+            (self.user.first_name, self.user.last_name), ("Changed", "New")
+        )
+
+    def test_user_save_evicts_cached_tokens(self):
+        self.assertEqual(self.get_profile(self.user.token).status_code, 200)
+        CustomUser.objects.get(id=self.user.id).save()
+        with self.assertNumQueries(1):
+            self.get_profile(self.user.token)
+
+    def test_expired_token_is_rejected(self):
+        AuthToken.objects.filter(user=self.user).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(self.get_profile(self.user.token).status_code, 401)
+
+    def test_malformed_token_is_rejected(self):
+        self.assertEqual(self.get_profile("not-a-uuid").status_code, 401)
+
+
+class DiffUserIdsTests(TestCase):
+    def test_operations_touch_only_the_difference(self):
+        a, b, c = (make_user(name).id for name in ("a", "b", "c"))
+        current = {a, b}
+        self.assertEqual(diff_user_ids("add", [b, c, 9999, "x"], current), ({c}, set()))
+        self.assertEqual(diff_user_ids("remove", [b, c], current), (set(), {b}))
+        self.assertEqual(diff_user_ids("replace", [b, c], current), ({c}, {a}))
+
+
+class JsonResponseTests(TestCase):
+    def test_encoders_agree_on_model_types(self):
+        data = {
+            "at": timezone.now(),
+            "day": date(2026, 1, 2),
+            "hours": Decimal("1.50"),
+            "token": uuid.uuid4(),
+            "counts": {1: 2},
+        }
+        expected = {
+            "at": data["at"].isoformat(),
+            "day": "2026-01-02",
+            "hours": 1.5,
+            "token": str(data["token"]),
+            "counts": {"1": 2},
+        }
+        self.assertEqual(json.loads(responses.stdlib_dumps(data)), expected)
+        if responses.orjson is not None:
+            self.assertEqual(json.loads(responses.orjson_dumps(data)), expected)
+
+    def test_response_rejects_non_dict_unless_unsafe(self):
+        with self.assertRaises(TypeError):
+            responses.JsonResponse([1])
+        response = responses.JsonResponse([1], safe=False, status=201)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(json.loads(response.content), [1])
+
+
+class SchemaTests(TestCase):
+    def test_decode_validates_and_converts(self):
+        schema = Schema(
+            due=DateTime(null=True),
+            hours=DecimalField(max_digits=5, decimal_places=2),
+        )
+        data = schema.decode(b'{"due": "2026-03-01T09:30:00", "hours": 1.5}')
+        self.assertTrue(timezone.is_aware(data["due"]))
+        self.assertEqual(data["hours"], Decimal("1.5"))
+        self.assertEqual(schema.decode(b'{"due": null}'), {"due": None})
+
+        for body in (
+            b"{not json",
+            b"[]",
+            b'{"due": "yesterday"}',
+            b'{"hours": 1234.5}',
+            b'{"hours": true}',
+        ):
+            with self.assertRaises(SchemaError):
+                schema.decode(body)
+
+    def test_model_derived_fields(self):
+        body = {
+            "email": "new@example.com",
+            "username": "x" * 31,
+            "first_name": "New",
+            "last_name": "User",
+            "password": "secret",
+        }
+        with self.assertRaisesMessage(SchemaError, "username"):
+            REGISTER.validate(body)
+        with self.assertRaisesMessage(SchemaError, "email"):
+            REGISTER.validate({**body, "username": "new", "email": "nope"})
+        with self.assertRaisesMessage(SchemaError, "Missing required fields"):
+            REGISTER.validate({"email": "new@example.com"})
 
-# Create your tests here.
+    def test_register_rejects_bad_payload_without_queries(self):
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                reverse("users:register"),
+                data={"email": "a@example.com", "username": 7},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 400)
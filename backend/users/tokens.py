@@ -0,0 +1,151 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import AuthToken, CustomUser
+
+
+def hash_token(raw):
+    """Digest a bearer token; only digests are ever stored."""
+    return hashlib.sha256(str(uuid.UUID(str(raw))).encode("ascii")).hexdigest()
+
+
+class TokenCache:
+    """Thread-safe LRU of token digest -> user row, with a per-entry TTL.
+
+    The cache is per process. Revocations made through this module, and
+    saves of the user row (see ``users.signals``), evict the entries
+    locally; other worker processes notice within ``ttl`` seconds. Users
+    are cached as column values and rebuilt per hit so requests never share
+    a model instance.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._keys_by_user = defaultdict(set)
+        self._lock = threading.Lock()
+        self._fields = [f.attname for f in CustomUser._meta.concrete_fields]
+        self._pk_index = self._fields.index(CustomUser._meta.pk.attname)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            deadline, values = entry
+            if deadline <= time.monotonic():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+        return CustomUser.from_db("default", self._fields, values)
+
+    def set(self, key, user, expires_at=None):
+        ttl = self.ttl
+        if expires_at is not None:
+            ttl = min(ttl, (expires_at - timezone.now()).total_seconds())
+        if ttl <= 0:
+            return
+        values = [getattr(user, name) for name in self._fields]
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + ttl, values)
+            self._keys_by_user[user.pk].add(key)
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, key):
+        """Drop ``key``; the caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[1][self._pk_index]
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+    def invalidate(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def invalidate_user(self, user_id):
+        """Evict every token of ``user_id``, e.g. after its row changed."""
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+
+token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE, settings.AUTH_TOKEN_CACHE_TTL)
+
+
+def register_token(user, raw):
+    """Record ``raw`` as a valid session token for ``user``."""
+    expires_at = None
+    if settings.AUTH_TOKEN_LIFETIME:
+        expires_at = timezone.now() + settings.AUTH_TOKEN_LIFETIME
+    return AuthToken.objects.create(
+        user=user, key_hash=hash_token(raw), expires_at=expires_at
+    )
+
+
+def issue_token(user):
+    """Create a new session token for ``user`` and return its bearer value."""
+    raw = uuid.uuid4()
+    register_token(user, raw)
+    return raw
+
+
+def revoke_token(raw):
+    key = hash_token(raw)
+    AuthToken.objects.filter(key_hash=key).delete()
+    token_cache.invalidate(key)
+
+
+def _accept(key, token):
+    if token.expires_at is not None and token.expires_at <= timezone.now():
+        return None
+    token_cache.set(key, token.user, token.expires_at)
+    return token.user
+
+
+def authenticate_token(raw):
+    """Return the user owning bearer token ``raw``, or None.
+
+    Cache hits cost no queries; misses are a single lookup on the unique
+    digest index joined to the user.
+    """
+    key = hash_token(raw)
+    user = token_cache.get(key)
+    if user is not None:
+        return user
+    try:
+        token = AuthToken.objects.select_related("user").get(key_hash=key)
+    except AuthToken.DoesNotExist:
+        return None
+    return _accept(key, token)
+
+
+async def aauthenticate_token(raw):
+    """Async version of ``authenticate_token`` for async views."""
+    key = hash_token(raw)
+    user = token_cache.get(key)
+    if user is not None:
+        return user
+    try:
+        token = await AuthToken.objects.select_related("user").aget(key_hash=key)
+    except AuthToken.DoesNotExist:
+        return None
+    return _accept(key, token)
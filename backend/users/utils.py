@@ -1,19 +1,53 @@
-import uuid
+import hashlib
+from functools import wraps
+from inspect import iscoroutine
 
-from django.http import JsonResponse
-from users.models import CustomUser
+from asgiref.sync import iscoroutinefunction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import CustomUser
+from .responses import JsonResponse
+from .tokens import aauthenticate_token, authenticate_token
+
+
+def _bearer_token(request):
+    auth_header = request.headers.get("Authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return None
+    return auth_header.split(" ")[1]
 
 
 def token_required(view_func):
+    """Authenticate the bearer token and attach its user to the request.
+
+    Works for both sync and async views; async views authenticate through
+    the async ORM so no thread is held while the lookup runs.
+    """
+    if iscoroutinefunction(view_func):
+
+        async def async_wrapper(request, *args, **kwargs):
+            token = _bearer_token(request)
+            if token is None:
+                return JsonResponse({"error": "Invalid authToken"}, status=401)
+            try:
+                user = await aauthenticate_token(token)
+            except ValueError:
+                user = None
+            if not user:
+                return JsonResponse({"error": "Invalid authToken"}, status=401)
+            request.user = user  # Attach user to request
+            return await view_func(request, *args, **kwargs)
+
+        return wraps(view_func)(async_wrapper)
+
     def wrapper(request, *args, **kwargs):
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
+        token = _bearer_token(request)
+        if token is None:
             return JsonResponse({"error": "Invalid authToken"}, status=401)
 
-        token = auth_header.split(" ")[1]
         try:
-            uuid_token = uuid.UUID(token)
-            user = CustomUser.objects.filter(authToken=uuid_token).first()
+            user = authenticate_token(token)
             if not user:
                 return JsonResponse({"error": "Invalid authToken"}, status=401)
             request.user = user  # Attach user to request
@@ -24,3 +58,119 @@ def token_required(view_func):
             return JsonResponse({"error": "Invalid authToken"}, status=401)
 
     return wrapper
+
+
+def parse_fields(raw, available):
+    """Parse a ``?fields=a,b,c`` selection against ``available``.
+
+    Returns None when no selection was made; raises ValueError on unknown
+    field names.
+    """
+    if not raw:
+        return None
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in available]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def existing_user_ids(user_ids):
+    ids = {pk for pk in user_ids if isinstance(pk, int)}
+    if not ids:
+        return set()
+    return set(CustomUser.objects.filter(id__in=ids).values_list("id", flat=True))
+
+
+def diff_user_ids(operation, user_ids, current):
+    """Return ``(add, remove)`` turning the ``current`` user ids into the
+    result of ``operation`` ("add", "remove" or "replace") with ``user_ids``.
+
+    Only ids of existing users are ever added; ids already in the right
+    state end up in neither set, so callers touch only the difference.
+    """
+    if operation == "remove":
+        return set(), {pk for pk in user_ids if isinstance(pk, int)} & current
+    wanted = existing_user_ids(user_ids)
+    if operation == "add":
+        return wanted - current, set()
+    return wanted - current, current - wanted
+
+
+def conditional(state_func):
+    """Answer GET/HEAD with 304 Not Modified when the data is unchanged.
+
+    ``state_func(request, *args, **kwargs)`` returns a cheap fingerprint of
+    the data the view would serialize, as ``(version, last_modified)``, or
+    None to skip conditional handling. The strong ETag hashes the version
+    with the full path and Accept header, since filters, cursors and
+    fieldsets all change the body. Only If-None-Match is honoured:
+    Last-Modified is advertised but cannot reflect deletions, so
+    If-Modified-Since alone never yields a 304.
+
+    Async views may use an async ``state_func``.
+
+    Must be applied inside ``token_required``.
+    """
+
+    def etag_for(request, version):
+        key = repr((version, request.get_full_path(), request.headers.get("Accept")))
+        return quote_etag(hashlib.sha256(key.encode("utf-8")).hexdigest()[:40])
+
+    def precondition(request, etag):
+        if request.headers.get("If-None-Match"):
+            return get_conditional_response(request, etag=etag)
+        return None
+
+    def finish(response, etag, last_modified):
+        response.headers.setdefault("ETag", etag)
+        if last_modified is not None:
+            response.headers.setdefault(
+                "Last-Modified", http_date(last_modified.timestamp())
+            )
+        return response
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return await view_func(request, *args, **kwargs)
+                state = state_func(request, *args, **kwargs)
+                if iscoroutine(state):
+                    state = await state
+                if state is None:
+                    return await view_func(request, *args, **kwargs)
+
+                version, last_modified = state
+                etag = etag_for(request, version)
+                response = precondition(request, etag)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                    if response.status_code != 200:
+                        return response
+                return finish(response, etag, last_modified)
+
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view_func(request, *args, **kwargs)
+            state = state_func(request, *args, **kwargs)
+            if state is None:
+                return view_func(request, *args, **kwargs)
+
+            version, last_modified = state
+            etag = etag_for(request, version)
+            response = precondition(request, etag)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            return finish(response, etag, last_modified)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,248 @@
+import datetime
+import decimal
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.validators import DecimalValidator
+from django.db import models
+from django.utils import timezone
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on the environment
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+if msgspec is not None:
+    _loads = msgspec.json.decode
+    _DECODE_ERRORS = (msgspec.DecodeError, ValueError)
+elif orjson is not None:
+    _loads = orjson.loads
+    _DECODE_ERRORS = (ValueError,)
+else:
+    _loads = json.loads
+    _DECODE_ERRORS = (ValueError,)
+
+
+class SchemaError(ValueError):
+    """A request body that does not match its schema; answered with 400."""
+
+
+MISSING = object()
+
+
+class Field:
+    """One attribute of a request body.
+
+    ``convert`` checks the type of a non-null value and returns it in the
+    form the model expects, raising SchemaError otherwise.
+    """
+
+    def __init__(self, required=False, default=MISSING, null=False, validators=()):
+        self.required = required
+        self.default = default
+        self.null = null
+        self.validators = tuple(validators)
+
+    def convert(self, value):
+        raise NotImplementedError
+
+    def clean(self, value):
+        value = self.convert(value)
+        for validator in self.validators:
+            try:
+                validator(value)
+            except ValidationError as e:
+                raise SchemaError("; ".join(e.messages))
+        return value
+
+
+class String(Field):
+    def __init__(self, max_length=None, choices=None, blank=None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_length = max_length
+        self.choices = frozenset(choices) if choices else None
+        self.blank = not self.required if blank is None else blank
+
+    def convert(self, value):
+        if not isinstance(value, str):
+            raise SchemaError("must be a string")
+        if not self.blank and not value.strip():
+            raise SchemaError("may not be blank")
+        if self.max_length is not None and len(value) > self.max_length:
+            raise SchemaError(f"must be at most {self.max_length} characters")
+        if self.choices is not None and value not in self.choices:
+            raise SchemaError(f"must be one of: {', '.join(sorted(self.choices))}")
+        return value
+
+
+class Integer(Field):
+    def __init__(self, min_value=None, **kwargs):
+        super().__init__(**kwargs)
+        self.min_value = min_value
+
+    def convert(self, value):
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise SchemaError("must be an integer")
+        if self.min_value is not None and value < self.min_value:
+            raise SchemaError(f"must be at least {self.min_value}")
+        return value
+
+
+class Boolean(Field):
+    def convert(self, value):
+        if not isinstance(value, bool):
+            raise SchemaError("must be true or false")
+        return value
+
+
+class Decimal(Field):
+    def __init__(self, max_digits=None, decimal_places=None, **kwargs):
+        super().__init__(**kwargs)
+        self.limit = DecimalValidator(max_digits, decimal_places)
+
+    def convert(self, value):
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise SchemaError("must be a number")
+        try:
+            value = decimal.Decimal(str(value))
+        except decimal.InvalidOperation:
+            raise SchemaError("must be a number")
+        if not value.is_finite():
+            raise SchemaError("must be a number")
+        try:
+            self.limit(value)
+        except ValidationError as e:
+            raise SchemaError("; ".join(e.messages))
+        return value
+
+
+class DateTime(Field):
+    def convert(self, value):
+        if not isinstance(value, str):
+            raise SchemaError("must be an ISO 8601 date-time string")
+        try:
+            value = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            raise SchemaError("must be an ISO 8601 date-time string")
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value
+
+
+class IntegerList(Field):
+    def __init__(self, max_items=None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_items = max_items
+
+    def convert(self, value):
+        if not isinstance(value, list) or not all(
+            isinstance(item, int) and not isinstance(item, bool) for item in value
+        ):
+            raise SchemaError("must be a list of integers")
+        if self.max_items is not None and len(value) > self.max_items:
+            raise SchemaError(f"must have at most {self.max_items} items")
+        return value
+
+
+class Object(Field):
+    """A nested JSON object validated by another Schema."""
+
+    def __init__(self, schema, **kwargs):
+        super().__init__(**kwargs)
+        self.schema = schema
+
+    def convert(self, value):
+        if not isinstance(value, dict):
+            raise SchemaError("must be an object")
+        return self.schema.validate(value)
+
+
+def from_model(model, name, **options):
+    """Build a Field mirroring ``model._meta.get_field(name)``.
+
+    Length limits, choices, decimal precision and nullability come from the
+    model, so the schema cannot drift from the column it feeds. Foreign keys
+    become positive integer ids. ``options`` override the derived settings.
+    """
+    field = model._meta.get_field(name)
+    derived = {"null": field.null}
+    if field.is_relation:
+        kind = Integer
+        derived["min_value"] = 1
+    elif isinstance(field, models.BooleanField):
+        kind = Boolean
+    elif isinstance(field, models.DecimalField):
+        kind = Decimal
+        derived.update(max_digits=field.max_digits, decimal_places=field.decimal_places)
+    elif isinstance(field, models.DateTimeField):
+        kind = DateTime
+    elif isinstance(field, (models.CharField, models.TextField)):
+        kind = String
+        derived["max_length"] = field.max_length
+        if field.choices:
+            derived["choices"] = [value for value, _ in field.choices]
+        if isinstance(field, models.EmailField):
+            derived["validators"] = field.default_validators
+    else:
+        raise TypeError(f"No schema field for {field.__class__.__name__}")
+    derived.update(options)
+    return kind(**derived)
+
+
+class Schema:
+    """A compiled request-body schema.
+
+    ``decode`` parses raw bytes (with msgspec or orjson when installed) and
+    validates every declared field before the view touches the database.
+    The result holds only the keys present in the body, plus declared
+    defaults, so views can still tell "absent" from "set". Unknown keys
+    are ignored unless ``strict`` is set, in which case they are rejected.
+    """
+
+    def __init__(self, required_error=None, strict=False, **fields):
+        self.fields = tuple(fields.items())
+        self.required = tuple(name for name, field in self.fields if field.required)
+        self.required_error = required_error
+        self.strict = strict
+
+    def decode(self, body):
+        try:
+            data = _loads(body)
+        except _DECODE_ERRORS:
+            raise SchemaError("Invalid JSON format")
+        return self.validate(data)
+
+    def validate(self, data):
+        if not isinstance(data, dict):
+            raise SchemaError("Request body must be a JSON object")
+        if self.strict:
+            unknown = set(data) - {name for name, _ in self.fields}
+            if unknown:
+                raise SchemaError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        missing = [name for name in self.required if data.get(name) is None]
+        if missing:
+            raise SchemaError(
+                self.required_error or f"Missing required fields: {', '.join(missing)}"
+            )
+
+        cleaned = {}
+        for name, field in self.fields:
+            value = data.get(name, MISSING)
+            if value is MISSING:
+                if field.default is not MISSING:
+                    cleaned[name] = field.default
+            elif value is None:
+                if not field.null:
+                    raise SchemaError(f"{name}: may not be null")
+                cleaned[name] = None
+            else:
+                try:
+                    cleaned[name] = field.clean(value)
+                except SchemaError as e:
+                    raise SchemaError(f"{name}: {e}")
+        return cleaned
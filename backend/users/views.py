@@ -1,13 +1,14 @@
-import json
 import logging
-import uuid
 
 from django.contrib.auth import authenticate
-from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 
 from .models import CustomUser
+from .responses import JsonResponse
+from .schemas import LOGIN, PROFILE_UPDATE, REGISTER
+from .tokens import issue_token
 from .utils import token_required
+from .validation import SchemaError
 
 logger = logging.getLogger(__name__)
 
@@ -16,36 +17,24 @@ logger = logging.getLogger(__name__)
 def register(request):
     if request.method == "POST":
         try:
-            data = json.loads(request.body.decode("utf-8"))
-            email = data.get("email")
-            username = data.get("username")
-            first_name = data.get("first_name")
-            last_name = data.get("last_name")
-            password = data.get("password")
+            data = REGISTER.decode(request.body)
 
-            if not all([email, username, first_name, last_name, password]):
-                return JsonResponse({"error": "Missing required fields"}, status=400)
-
-            if CustomUser.objects.filter(email=email).exists():
+            if CustomUser.objects.filter(email=data["email"]).exists():
                 return JsonResponse({"error": "Email already exists"}, status=409)
 
-            if CustomUser.objects.filter(username=username).exists():
+            if CustomUser.objects.filter(username=data["username"]).exists():
                 return JsonResponse({"error": "Username already exists"}, status=409)
 
-            user = CustomUser(
-                email=email,
-                username=username,
-                first_name=first_name,
-                last_name=last_name,
-                password=password,
-            )
+            user = CustomUser(**data)
             user.save()
+            # Every account starts with one session.
+            token = issue_token(user)
 
             return JsonResponse(
                 {
                     "message": "Registration successful",
                     "user": {
-                        "authToken": str(user.authToken),
+                        "authToken": token,
                         "email": user.email,
                         "first_name": user.first_name,
                         "last_name": user.last_name,
@@ -53,8 +42,8 @@ def register(request):
                 },
                 status=201,
             )
-        except json.JSONDecodeError:
-            return JsonResponse({"error": "Invalid JSON format"}, status=400)
+        except SchemaError as e:
+            return JsonResponse({"error": str(e)}, status=400)
         except Exception as e:
             logger.error(f"Registration error: {str(e)}")
             return JsonResponse({"error": str(e)}, status=500)
@@ -65,28 +54,24 @@ def register(request):
 def login_view(request):
     if request.method == "POST":
         try:
-            data = json.loads(request.body.decode("utf-8"))
-            email = data.get("email")
-            password = data.get("password")
-
-            if not all([email, password]):
-                return JsonResponse({"error": "Missing required fields"}, status=400)
+            data = LOGIN.decode(request.body)
 
             try:
-                user = CustomUser.objects.filter(email=email, password=password).first()
+                user = CustomUser.objects.filter(**data).first()
                 if not user:
                     return JsonResponse({"error": "Invalid credentials"}, status=401)
             except CustomUser.DoesNotExist:
                 return JsonResponse({"error": "Invalid credentials"}, status=401)
 
-            user.authToken = uuid.uuid4()
-            user.save()
+            # Each login opens a new session; earlier ones stay valid until
+            # they expire or are revoked.
+            token = issue_token(user)
             if user is not None:
                 return JsonResponse(
                     {
                         "message": "Login successful",
                         "user": {
-                            "authToken": str(user.authToken),
+                            "authToken": token,
                             "email": user.email,
                             "username": user.username,
                             "first_name": user.first_name,
@@ -96,8 +81,8 @@ def login_view(request):
                     status=200,
                 )
             return JsonResponse({"error": "Invalid credentials"}, status=401)
-        except json.JSONDecodeError:
-            return JsonResponse({"error": "Invalid JSON format"}, status=400)
+        except SchemaError as e:
+            return JsonResponse({"error": str(e)}, status=400)
         except Exception as e:
             logger.error(f"Login error: {str(e)}")
             return JsonResponse({"error": str(e)}, status=500)
@@ -106,7 +91,7 @@ def login_view(request):
 
 @csrf_exempt
 @token_required
-def profile(request):
+async def profile(request):
     if request.method == "GET":
         user = request.user
         return JsonResponse(
@@ -115,21 +100,20 @@ def profile(request):
                 "username": user.username,
                 "first_name": user.first_name,
                 "last_name": user.last_name,
-                "authToken": str(user.authToken),
             },
             status=200,
         )
 
     elif request.method == "PUT":
         try:
-            data = json.loads(request.body.decode("utf-8"))
+            data = PROFILE_UPDATE.decode(request.body)
             user = request.user
-            user.username = data.get("username", user.username)
-            user.first_name = data.get("first_name", user.first_name)
-            user.last_name = data.get("last_name", user.last_name)
-            user.password = data.get("password", user.password)
+            for name, value in data.items():
+                setattr(user, name, value)
 
-            user.save()
+            # Write only what the client sent; the rest of ``user`` may be a
+            # snapshot from the token cache.
+            await user.asave(update_fields=list(data))
             return JsonResponse(
                 {
                     "message": "Request processed successfully",
@@ -137,12 +121,11 @@ def profile(request):
                     "username": user.username,
                     "first_name": user.first_name,
                     "last_name": user.last_name,
-                    "authToken": str(user.authToken),
                 },
                 status=200,
             )
-        except json.JSONDecodeError:
-            return JsonResponse({"error": "Invalid JSON format"}, status=400)
+        except SchemaError as e:
+            return JsonResponse({"error": str(e)}, status=400)
         except Exception as e:
             logger.error(f"Profile update error: {str(e)}")
             return JsonResponse({"error": str(e)}, status=500)